@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 from utils.carrega_dados import carregar_dados
+from utils.navegador import navegador_dados
 
 st.set_page_config(
     page_title="Análise Spotify Tracks",
@@ -67,20 +68,10 @@ with row1[2]:
 
 st.markdown("---")
 
-with st.expander("Clique para espiar a Amostra dos Dados (Top 10 linhas)"):
-    st.dataframe(
-        df.head(10),
-        use_container_width=True,
-        column_config={
-            "track_name": "Música",
-            "artists": "Artista",
-            "album_name": "Álbum",
-            "popularity": st.column_config.ProgressColumn(
-                "Popularidade", format="%d", min_value=0, max_value=100
-            ),
-        }
-    )
-    st.caption(f"Mostrando as primeiras 10 linhas de {total_faixas} registros.")
+with st.expander("Clique para navegar pelos Dados"):
+    # Paginação, ordenação e escolha de colunas são feitas no servidor:
+    # só as linhas da página atual são enviadas ao navegador
+    navegador_dados(df)
 
 st.sidebar.markdown("---")
 st.sidebar.info("**Dica:** Use o modo 'Dark' do Streamlit para uma melhor experiência visual.")
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""Benchmark do índice de busca (utils/busca.py).
+
+Mede o tempo de construção, o tamanho do índice e a latência das consultas,
+comparando com um `str.contains` sobre o DataFrame inteiro.
+
+Uso:
+    python -m benchmarks.bench_busca --dados dataset/dataset.csv
+"""
+import argparse
+import statistics
+import time
+
+from utils.busca import IndiceBusca, normalizar, CAMPOS_BUSCA
+from utils.carrega_dados import CAMINHO_ARQUIVO, preparar_dados
+
+# Consultas curtas (1-2 caracteres), comuns e raras
+CONSULTAS_PADRAO = ['a', 'lo', 'love', 'the', 'remix', 'taylor swift', 'acoustic version', 'zzzq']
+
+
+def _cronometrar(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return resultado, tempos
+
+
+def _percentil(tempos, p):
+    return statistics.quantiles(tempos, n=100, method='inclusive')[p - 1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do índice de busca por n-gramas.")
+    parser.add_argument('--dados', default=CAMINHO_ARQUIVO, help="Caminho do dataset.csv")
+    parser.add_argument('--repeticoes', type=int, default=20, help="Repetições de cada consulta")
+    parser.add_argument('--consultas', nargs='*', default=CONSULTAS_PADRAO)
+    args = parser.parse_args(argv)
+
+    df = preparar_dados(args.dados)
+
+    inicio = time.perf_counter()
+    indice = IndiceBusca(df)
+    tempo_construcao = time.perf_counter() - inicio
+
+    print(f"Linhas indexadas:    {len(indice)}")
+    print(f"N-gramas distintos:  {len(indice.ngramas)}")
+    print(f"N-gramas curtos:     {len(indice.ngramas_curtos)}")
+    print(f"Tamanho do índice:   {indice.tamanho_bytes() / 1024 ** 2:.1f} MB")
+    print(f"Tempo de construção: {tempo_construcao:.2f} s")
+    print()
+
+    # Referência: varredura completa, como seria sem o índice
+    textos = df[CAMPOS_BUSCA].astype(str).agg('\n'.join, axis=1).map(normalizar)
+
+    print(f"{'consulta':<20} {'linhas':>8} {'p50 ms':>8} {'p95 ms':>8} {'scan ms':>8}")
+    for consulta in args.consultas:
+        resultado, tempos = _cronometrar(lambda: indice.buscar(consulta), args.repeticoes)
+        _, tempos_scan = _cronometrar(
+            lambda: textos.str.contains(normalizar(consulta), regex=False), max(1, args.repeticoes // 5)
+        )
+        print(f"{consulta:<20} {len(resultado):>8} "
+              f"{_percentil(tempos, 50):>8.2f} {_percentil(tempos, 95):>8.2f} "
+              f"{statistics.median(tempos_scan):>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
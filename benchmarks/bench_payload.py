@@ -0,0 +1,96 @@
+"""Benchmark do tamanho dos gráficos enviados ao navegador (utils/figuras.py).
+
+Monta os gráficos mais pesados das páginas 02, 03 e 04 com os filtros
+padrão e compara o JSON original com o JSON compactado. Também confere que
+nenhum valor exibido sem formatação no hover foi enviado em float32 (o
+hover mostraria 3.8489999771118164 em vez de 3.849).
+
+Uso:
+    python -m benchmarks.bench_payload --dados dataset/dataset.csv
+"""
+import argparse
+import json
+import re
+import time
+
+import plotly.express as px
+import plotly.io as pio
+
+from utils.analise_genero import figura_3d
+from utils.carrega_dados import CAMINHO_ARQUIVO, preparar_dados
+from utils.figuras import compactar_figura, tamanho_payload
+
+
+def montar_graficos(df):
+    # Mesma seleção padrão das páginas: os 10 gêneros com mais faixas
+    top_10 = df['track_genre'].value_counts().head(10).index.tolist()
+    df_filtrado = df[df['track_genre'].isin(top_10)]
+    genero = top_10[0]
+
+    return {
+        'box_popularidade': px.box(df_filtrado, x='track_genre', y='popularity',
+                                   points='outliers', color='track_genre'),
+        'scatter_danca_energia': px.scatter(
+            df_filtrado.sample(min(1000, len(df_filtrado)), random_state=0),
+            x='danceability', y='energy', color='track_genre', size='popularity',
+            hover_data=['track_name', 'artists', 'popularity']
+        ),
+        'violin_valencia': px.violin(df_filtrado, x='track_genre', y='valence', color='track_genre',
+                                     box=True, points='outliers'),
+        'scatter_3d_genero': figura_3d(df[df['track_genre'] == genero], genero, semente=0),
+    }
+
+
+# Referências do hovertemplate sem formato explícito, ex.: %{marker.size}
+_REFERENCIA_HOVER = re.compile(r'%\{([a-z0-9_.]+)\}')
+
+
+def _ler_caminho(trace, caminho):
+    for parte in caminho.split('.'):
+        if not isinstance(trace, dict) or parte not in trace:
+            return None
+        trace = trace[parte]
+    return trace
+
+
+def hover_em_float32(fig):
+    """Atributos citados sem formato no hover que seguiram como float32."""
+    problemas = []
+    for trace in json.loads(pio.to_json(fig, validate=False))['data']:
+        for caminho in _REFERENCIA_HOVER.findall(trace.get('hovertemplate') or ''):
+            # x, y e z são formatados pelo eixo
+            if caminho in ('x', 'y', 'z'):
+                continue
+            valor = _ler_caminho(trace, caminho)
+            if isinstance(valor, dict) and valor.get('dtype') == 'f4':
+                problemas.append(caminho)
+    return sorted(set(problemas))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara o payload original e compactado dos gráficos.")
+    parser.add_argument('--dados', default=CAMINHO_ARQUIVO, help="Caminho do dataset.csv")
+    args = parser.parse_args(argv)
+
+    df = preparar_dados(args.dados)
+
+    print(f"{'gráfico':<24} {'original':>10} {'compacto':>10} {'redução':>8} {'ms':>7}  hover")
+    total_original = total_compacto = 0
+    # Monta os gráficos duas vezes: copiar uma figura já converte os arrays
+    # para o formato de envio, o que atrapalharia a compactação
+    originais, para_compactar = montar_graficos(df), montar_graficos(df)
+    for nome, fig in originais.items():
+        original = tamanho_payload(fig)
+        inicio = time.perf_counter()
+        compacto = tamanho_payload(compactar_figura(para_compactar[nome]))
+        duracao = (time.perf_counter() - inicio) * 1000
+        total_original += original
+        total_compacto += compacto
+        problemas = hover_em_float32(para_compactar[nome])
+        hover = 'ok' if not problemas else 'float32 em ' + ', '.join(problemas)
+        print(f"{nome:<24} {original:>10} {compacto:>10} {1 - compacto / original:>8.0%} {duracao:>7.1f}  {hover}")
+    print(f"{'total':<24} {total_original:>10} {total_compacto:>10} {1 - total_compacto / total_original:>8.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+"""Teste de carga com várias sessões simultâneas (Streamlit AppTest).
+
+Cada sessão abre uma página e repete interações parecidas com as de um
+usuário real (editar o multiselect de gêneros, arrastar sliders, trocar de
+aba e de gênero), medindo o tempo de cada rerun. As sessões rodam em threads
+do mesmo processo, compartilhando os caches como num servidor Streamlit.
+
+Para cada nível de concorrência, mostra p50/p95/p99 da latência de rerun,
+a vazão (reruns por segundo, contada depois que todas as sessões abriram a
+página) e o quanto o pico de memória (RSS) do processo subiu em relação ao
+RSS do início do nível.
+
+Uso (a partir da raiz do projeto, onde fica a pasta dataset/):
+    python -m benchmarks.carga --sessoes 1 2 4 8 --interacoes 20
+"""
+import argparse
+import gc
+import os
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from streamlit.testing.v1 import AppTest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tempo máximo de um rerun antes de o AppTest desistir
+TIMEOUT_RERUN = 120
+
+# Tempo máximo de espera pela carga inicial de todas as sessões
+TIMEOUT_LARGADA = 2 * TIMEOUT_RERUN
+
+
+def _widget(elementos, rotulo):
+    # Localiza o widget pelo começo do rótulo, que não muda entre reruns
+    return next(w for w in elementos if w.label.startswith(rotulo))
+
+
+# --- Interações da página 02 (Visão Geral) ---
+
+def _editar_generos(at, rng):
+    filtro = _widget(at.multiselect, "Selecione os Generos")
+    atuais = list(filtro.value)
+    if len(atuais) > 1 and rng.random() < 0.5:
+        atuais.remove(rng.choice(atuais))
+    else:
+        atuais.append(rng.choice([g for g in filtro.options if g not in atuais]))
+    filtro.set_value(atuais)
+
+
+def _arrastar_popularidade(at, rng):
+    inicio = rng.randint(0, 60)
+    _widget(at.slider, "Faixa de Popularidade").set_value((inicio, rng.randint(inicio + 10, 100)))
+
+
+def _trocar_explicito(at, rng):
+    _widget(at.selectbox, "Conteudo Explicito").set_value(rng.choice(["Todos", "Sim", "Nao"]))
+
+
+# --- Interações da página 04 (Tendências) ---
+
+def _mudar_top_n(at, rng):
+    _widget(at.slider, "Top N").set_value(rng.randint(5, 20))
+
+
+def _mudar_metrica(at, rng):
+    metrica = _widget(at.selectbox, "Métrica para Ranking")
+    metrica.set_value(rng.choice(metrica.options))
+
+
+def _comparar_generos(at, rng):
+    comparar = _widget(at.multiselect, "Selecione até 5")
+    comparar.set_value(rng.sample(comparar.options, rng.randint(1, 5)))
+
+
+def _trocar_genero_detalhado(at, rng):
+    # Troca de aba: no Streamlit todas as abas rodam a cada rerun, então o
+    # custo de "ir para a Análise Detalhada" é o de escolher outro gênero
+    genero = _widget(at.selectbox, "Escolha um gênero")
+    genero.set_value(rng.choice(genero.options))
+
+
+ROTEIROS = {
+    'visao_geral': (
+        'pages/02_Visao_Geral.py',
+        [_editar_generos, _editar_generos, _arrastar_popularidade, _arrastar_popularidade, _trocar_explicito],
+    ),
+    'tendencias': (
+        'pages/04_Tendencia_Genero.py',
+        [_mudar_top_n, _mudar_metrica, _comparar_generos, _trocar_genero_detalhado, _trocar_genero_detalhado],
+    ),
+}
+
+
+class MonitorMemoria:
+    """Amostra o RSS do processo em segundo plano e guarda o pico.
+
+    `base` é o RSS na entrada; como os níveis rodam um depois do outro no
+    mesmo processo, o que interessa de cada nível é `pico - base`.
+    """
+
+    def __init__(self, intervalo=0.05):
+        self.intervalo = intervalo
+        self.base = 0
+        self.pico = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, daemon=True)
+
+    def _rss_atual(self):
+        try:
+            with open('/proc/self/status') as status:
+                for linha in status:
+                    if linha.startswith('VmRSS:'):
+                        return int(linha.split()[1]) * 1024
+        except OSError:
+            pass
+        # Sem /proc (macOS): pico desde o início do processo, já em bytes
+        fator = 1 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * fator
+
+    def _amostrar(self):
+        while not self._parar.is_set():
+            self.pico = max(self.pico, self._rss_atual())
+            self._parar.wait(self.intervalo)
+
+    def __enter__(self):
+        gc.collect()
+        self.base = self.pico = self._rss_atual()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._thread.join()
+
+
+def executar_sessao(arquivo, acoes, interacoes, semente, largada=None):
+    """Roda uma sessão e devolve a latência (s) de cada rerun após a carga inicial.
+
+    Com `largada` (um `threading.Barrier`), espera todas as sessões
+    terminarem a carga inicial antes de começar as interações.
+    """
+    rng = random.Random(semente)
+    try:
+        at = AppTest.from_file(os.path.join(RAIZ, arquivo), default_timeout=TIMEOUT_RERUN)
+        at.run()
+    except BaseException:
+        # Com a barreira quebrada, as outras sessões e a thread principal
+        # param de esperar (BrokenBarrierError) em vez de travar
+        if largada is not None:
+            largada.abort()
+        raise
+    if largada is not None:
+        largada.wait(timeout=TIMEOUT_LARGADA)
+    _verificar_erro(at, arquivo)
+
+    latencias = []
+    for _ in range(interacoes):
+        rng.choice(acoes)(at, rng)
+        inicio = time.perf_counter()
+        at.run()
+        latencias.append(time.perf_counter() - inicio)
+        _verificar_erro(at, arquivo)
+    return latencias
+
+
+def _verificar_erro(at, arquivo):
+    # Um erro na página aparece em `at.exception`, não como exceção
+    if at.exception:
+        raise RuntimeError(f"{arquivo}: {at.exception[0].value}")
+
+
+def _percentil(valores, p):
+    if len(valores) < 2:
+        return valores[0]
+    return statistics.quantiles(valores, n=100, method='inclusive')[p - 1]
+
+
+def medir(roteiro, sessoes, interacoes, semente=0):
+    """Roda `sessoes` sessões simultâneas e devolve as métricas do nível."""
+    arquivo, acoes = ROTEIROS[roteiro]
+    # As sessões e esta thread esperam juntas o fim das cargas iniciais, que
+    # ficam fora da contagem de reruns e, portanto, fora do tempo da vazão
+    largada = threading.Barrier(sessoes + 1)
+    with MonitorMemoria() as memoria, ThreadPoolExecutor(max_workers=sessoes) as executor:
+        futuros = [
+            executor.submit(executar_sessao, arquivo, acoes, interacoes, semente + i, largada)
+            for i in range(sessoes)
+        ]
+        try:
+            largada.wait(timeout=TIMEOUT_LARGADA)
+        except threading.BrokenBarrierError:
+            # Mostra o erro da sessão que quebrou a barreira, se houver
+            wait(futuros)
+            for futuro in futuros:
+                erro = futuro.exception()
+                if erro is not None and not isinstance(erro, threading.BrokenBarrierError):
+                    raise erro
+            raise
+        inicio = time.perf_counter()
+        latencias = [latencia for futuro in futuros for latencia in futuro.result()]
+        duracao = time.perf_counter() - inicio
+
+    return {
+        'sessoes': sessoes,
+        'reruns': len(latencias),
+        'p50': _percentil(latencias, 50),
+        'p95': _percentil(latencias, 95),
+        'p99': _percentil(latencias, 99),
+        'vazao': len(latencias) / duracao,
+        'rss_base': memoria.base,
+        'rss_acrescimo': memoria.pico - memoria.base,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga com sessões simultâneas.")
+    parser.add_argument('--roteiro', choices=list(ROTEIROS), nargs='*', default=list(ROTEIROS),
+                        help="Páginas a testar")
+    parser.add_argument('--sessoes', type=int, nargs='*', default=[1, 2, 4, 8],
+                        help="Níveis de concorrência (sessões simultâneas)")
+    parser.add_argument('--interacoes', type=int, default=20, help="Interações por sessão")
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for roteiro in args.roteiro:
+        print(f"\n== {roteiro} ({ROTEIROS[roteiro][0]}) ==")
+        print(f"{'sessões':>8} {'reruns':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'reruns/s':>9} {'RSS base MB':>12} {'+pico MB':>9}")
+        for sessoes in args.sessoes:
+            m = medir(roteiro, sessoes, args.interacoes, args.semente)
+            print(f"{m['sessoes']:>8} {m['reruns']:>7} {m['p50'] * 1000:>8.0f} {m['p95'] * 1000:>8.0f} "
+                  f"{m['p99'] * 1000:>8.0f} {m['vazao']:>9.2f} {m['rss_base'] / 1024 ** 2:>12.0f} "
+                  f"{m['rss_acrescimo'] / 1024 ** 2:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+# Permite rodar `pytest` direto da raiz: os testes importam `utils`
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
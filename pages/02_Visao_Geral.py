@@ -1,6 +1,10 @@
 import streamlit as st
 import plotly.express as px
 from utils.carrega_dados import carregar_dados
+from utils.figuras import exibir_grafico
+from utils.orcamento import escolher_nivel, indicar_nivel, figura_box
+from utils.exportacao import botoes_exportacao
+from utils.busca import filtrar_por_busca
 
 st.set_page_config(
     page_title='Visao Geral',  
@@ -43,6 +47,12 @@ with st.expander("Filtros de Dados", expanded=True):
         value=(0, 100)  
     )
 
+    # Busca por nome da musica, artista ou album
+    filtro_busca = st.text_input(
+        "Buscar faixa, artista ou album",
+        placeholder="Ex.: love, Taylor Swift..."
+    )
+
 df_filtrado = df.copy()
 
 # Lógica de filtragem por Gênero
@@ -64,6 +74,9 @@ df_filtrado = df_filtrado[
     (df_filtrado['popularity'] <= filtro_pop[1])   
 ]
 
+# Busca de texto
+df_filtrado = filtrar_por_busca(df, df_filtrado, filtro_busca)
+
 if df_filtrado.empty:
     st.warning("Nenhum dado encontrado com essa combinacao de filtros")
     st.stop() 
@@ -74,18 +87,24 @@ col1.metric("Total de Faixas", len(df_filtrado))
 col2.metric("Artistas Unicos", df_filtrado['artists'].nunique()) 
 col3.metric("Generos Selecionados", df_filtrado['track_genre'].nunique())
 col4.metric("Duracao Media (min)", f"{df_filtrado['duration_min'].mean():.2f}")
+
+# Download da selecao atual, gerado uma vez por combinacao de filtros
+botoes_exportacao(df, df_filtrado, (tuple(sorted(filtro_generos)), filtro_explicit, tuple(filtro_pop), filtro_busca.strip()))
 st.divider()
 
 st.subheader('Distribuicao de Popularidade por Genero Selecionado')
 
+# Nivel de detalhe do grafico conforme o tamanho da selecao
+n_generos = df_filtrado['track_genre'].nunique()
+nivel_pop = escolher_nivel(len(df_filtrado), n_generos)
+
 # Criação do Boxplot Plotly 
-fig = px.box(df_filtrado,
+fig = figura_box(df_filtrado,
     x='track_genre',   
     y='popularity',    
-    points='outliers', 
+    nivel=nivel_pop,
     title=f'Distribuicao de Popularidade ({len(df_filtrado)} faixas)', 
-    labels={'popularity':'Popularidade (0-100)', 'track_genre':'Genero'}, 
-    color='track_genre' 
+    labels={'popularity':'Popularidade (0-100)', 'track_genre':'Genero'}
 )
 
 fig.update_layout(
@@ -96,19 +115,22 @@ fig.update_layout(
     showlegend=False  
 )
 # Renderiza o gráfico 
-st.plotly_chart(fig, use_container_width=True)
+exibir_grafico(fig, 'box_popularidade', use_container_width=True)
+indicar_nivel(nivel_pop, len(df_filtrado), n_generos)
 
 st.divider()
 
 st.subheader('Relacao Energia vs Conteudo Explicito')
 
-fig_energy = px.box(df_filtrado,
+n_classes = df_filtrado['explicit_str'].nunique()
+nivel_energia = escolher_nivel(len(df_filtrado), n_classes)
+
+fig_energy = figura_box(df_filtrado,
     x='explicit_str',  
     y='energy',       
-    points='outliers',
+    nivel=nivel_energia,
     title='Energia: Musicas Explicitas vs Nao Explicitas',
     labels={'energy':'Energia (0-1)', 'explicit_str':'Conteudo Explicito'},
-    color='explicit_str', 
     color_discrete_sequence=px.colors.qualitative.Pastel 
 )
 
@@ -119,7 +141,8 @@ fig_energy.update_layout(
     margin=dict(t=80)
 )
 # Renderiza o segundo gráfico
-st.plotly_chart(fig_energy, use_container_width=True)
+exibir_grafico(fig_energy, 'box_energia', use_container_width=True)
+indicar_nivel(nivel_energia, len(df_filtrado), n_classes)
 
 st.divider()
 
@@ -145,6 +168,6 @@ if not df_explicit_pie.empty:
     )
     fig_donut.update_traces(textinfo='percent+label')
     # Renderiza o gráfico
-    st.plotly_chart(fig_donut, use_container_width=True)
+    exibir_grafico(fig_donut, 'pizza_explicito', use_container_width=True)
 else:
     st.info("Dados insuficientes para gerar o grafico de pizza")
\ No newline at end of file
@@ -2,6 +2,12 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 from utils.carrega_dados import carregar_dados
+from utils.figuras import exibir_grafico
+from utils.orcamento import LIMITE_GRUPOS, escolher_nivel, indicar_nivel, figura_violin
+from utils.selecao import (calcular_cubo, regioes_da_selecao, chave_regioes, agregar, total_faixas,
+                           media_geral, medias_por_genero, correlacao)
+from utils.exportacao import botoes_exportacao
+from utils.busca import filtrar_por_busca
 
 # Configura as propriedades básicas da página (título da aba, layout)
 st.set_page_config(
@@ -54,6 +60,12 @@ with st.expander("Filtros de Dados", expanded=True):
         value=(0, 100) # Tupla indicando intervalo selecionado (início, fim)
     )
 
+    # Busca por nome da música, artista ou álbum (usa o índice de n-gramas)
+    filtro_busca = st.text_input(
+        "Buscar faixa, artista ou álbum",
+        placeholder="Ex.: love, Taylor Swift..."
+    )
+
 # Cria uma cópia para filtrar sem perder os dados originais
 df_filtrado = df.copy()
 
@@ -77,18 +89,61 @@ df_filtrado = df_filtrado[
     (df_filtrado['popularity'] <= filtro_pop[1])
 ]
 
+# Aplica a busca de texto sobre a seleção já filtrada
+df_filtrado = filtrar_por_busca(df, df_filtrado, filtro_busca)
+
 # Validação final pós-filtragem
 if df_filtrado.empty:
     st.warning("Nenhum dado encontrado com essa combinação de filtros")
     st.stop()
 
+# --- Seleção no gráfico de dispersão (cross-filtering) ---
+chave_filtros = (tuple(sorted(filtro_generos)), filtro_explicit, tuple(filtro_pop), filtro_busca.strip())
+
+# Estatísticas por célula da grade dançabilidade x energia, uma vez por filtro
+cubo = calcular_cubo(df_filtrado, chave_filtros)
+
+# Amostra de 1000 itens exibida no gráfico de dispersão, para não travar o
+# navegador com excesso de pontos (semente fixa para os pontos não mudarem
+# de lugar a cada seleção)
+df_amostra = df_filtrado.sample(min(1000, len(df_filtrado)), random_state=0)
+
+# A seleção (box/lasso) do gráfico de dispersão já está no session_state no
+# início do rerun, então KPIs e gráficos acima dele também podem usá-la.
+# Quando os filtros mudam a amostra, a figura muda e o Streamlit recria o
+# gráfico sem seleção; a seleção guardada é de um gráfico que já não existe
+# e é ignorada
+assinatura_amostra = hash(tuple(df_amostra.index))
+if st.session_state.get('amostra_selecao') == assinatura_amostra:
+    regioes = regioes_da_selecao(st.session_state.get('selecao_dispersao'))
+else:
+    regioes = []
+agregado = agregar(cubo, regioes)
+if regioes and total_faixas(agregado) == 0:
+    st.warning("Nenhuma faixa na região selecionada; mostrando toda a seleção dos filtros")
+    regioes = []
+    agregado = agregar(cubo, regioes)
+
+# Linhas da seleção, usadas só pelo violino (os demais usam as somas por célula)
+df_selecao = df_filtrado.iloc[agregado['posicoes']] if regioes else df_filtrado
+
 # --- Seção de Métricas (KPIs) ---
 col1, col2, col3, col4 = st.columns(4)
 # Mostra contagem total e médias de atributos principais
-col1.metric("Faixas Analisadas", len(df_filtrado))
-col2.metric("Dançabilidade Média", f"{df_filtrado['danceability'].mean():.2f}")
-col3.metric("Energia Média", f"{df_filtrado['energy'].mean():.2f}")
-col4.metric("Valência Média", f"{df_filtrado['valence'].mean():.2f}")
+col1.metric("Faixas Analisadas", total_faixas(agregado))
+col2.metric("Dançabilidade Média", f"{media_geral(agregado, 'danceability'):.2f}")
+col3.metric("Energia Média", f"{media_geral(agregado, 'energy'):.2f}")
+col4.metric("Valência Média", f"{media_geral(agregado, 'valence'):.2f}")
+
+if regioes:
+    st.caption(
+        f"Região selecionada no gráfico de dispersão: {total_faixas(agregado)} de {len(df_filtrado)} faixas. "
+        "Dê um duplo clique no gráfico para limpar a seleção."
+    )
+
+# Download da seleção atual, gerado uma vez por combinação de filtros
+# (com a região selecionada no gráfico de dispersão, como as métricas acima)
+botoes_exportacao(df, df_selecao, chave_filtros + (chave_regioes(regioes),))
 
 st.divider()
 
@@ -97,8 +152,7 @@ st.subheader("Relação entre Dançabilidade e Energia")
 
 # Cria gráfico de dispersão para ver correlação entre duas variáveis
 fig_scatter = px.scatter(
-    # Amostra de 1000 itens para não travar o navegador com excesso de pontos
-    df_filtrado.sample(min(1000, len(df_filtrado))),
+    df_amostra,
     x='danceability',
     y='energy',
     color='track_genre', # Cores diferentes por gênero
@@ -118,7 +172,13 @@ fig_scatter.update_layout(
     title_x=0.5,
     hovermode='closest'
 )
-st.plotly_chart(fig_scatter, use_container_width=True)
+# Selecionar uma região (box ou lasso) filtra os demais gráficos da página
+exibir_grafico(
+    fig_scatter, 'scatter_danca_energia', use_container_width=True,
+    on_select='rerun', selection_mode=('box', 'lasso'), key='selecao_dispersao'
+)
+# Amostra do gráfico a que a próxima seleção vai se referir
+st.session_state['amostra_selecao'] = assinatura_amostra
 
 st.divider()
 
@@ -128,8 +188,12 @@ st.subheader("Perfil Musical Médio por Gênero")
 # Define as colunas numéricas que formam o "DNA" musical
 caracteristicas = ['danceability', 'energy', 'valence', 'acousticness', 'instrumentalness', 'speechiness']
 
-# Calcula a média de cada característica agrupada por gênero
-df_radar = df_filtrado.groupby('track_genre')[caracteristicas].mean().reset_index()
+# Média de cada característica por gênero, somando as células da seleção
+df_radar = medias_por_genero(agregado, caracteristicas)
+
+# Um trace por gênero: acima do limite, ficam só os gêneros com mais faixas
+radar_limitado = len(df_radar) > LIMITE_GRUPOS
+df_radar = df_radar.nlargest(LIMITE_GRUPOS, 'total').reset_index()
 
 # Inicializa uma figura vazia do Graph Objects
 fig_radar = go.Figure()
@@ -157,7 +221,12 @@ fig_radar.update_layout(
     title_x=0.5,
     height=500
 )
-st.plotly_chart(fig_radar, use_container_width=True)
+exibir_grafico(fig_radar, 'radar_generos', use_container_width=True)
+if radar_limitado:
+    st.caption(
+        f"Detalhe reduzido para manter o gráfico leve: mostrando os {LIMITE_GRUPOS} gêneros "
+        f"com mais faixas de {len(medias_por_genero(agregado))} selecionados."
+    )
 
 st.divider()
 
@@ -171,8 +240,8 @@ with col_corr1:
     caracteristicas_corr = ['danceability', 'energy', 'valence', 'acousticness', 
                             'instrumentalness', 'speechiness', 'liveness', 'popularity']
     
-    # Pandas calcula a correlação de Pearson entre todas as colunas listadas
-    corr_matrix = df_filtrado[caracteristicas_corr].corr()
+    # Correlação de Pearson calculada a partir das somas por célula da seleção
+    corr_matrix = correlacao(agregado, caracteristicas_corr)
     
     # Renderiza a matriz como imagem térmica
     fig_heatmap = px.imshow(
@@ -190,7 +259,7 @@ with col_corr1:
         title_x=0.5,
         height=500
     )
-    st.plotly_chart(fig_heatmap, use_container_width=True)
+    exibir_grafico(fig_heatmap, 'heatmap_correlacao', use_container_width=True)
 
 with col_corr2:
     st.info("""
@@ -210,15 +279,26 @@ st.divider()
 # --- Gráfico 4: Violin Plot (Distribuição + Densidade) ---
 st.subheader("Distribuição de Valência Musical")
 
+# Nível de detalhe conforme o tamanho da seleção (amostra ou box pré-calculado)
+n_generos = df_selecao['track_genre'].nunique()
+nivel_violin = escolher_nivel(len(df_selecao), n_generos)
+
+# O título descreve o que o nível realmente desenha: nos níveis resumidos
+# não há pontos (box pré-calculado ou barras de médias)
+titulos_violin = {
+    'completo': 'Valência por Gênero (com outliers)',
+    'outliers_limitados': 'Valência por Gênero (amostra, com outliers)',
+    'pre_agrupado': 'Valência por Gênero (quartis, sem pontos)',
+    'agregado': 'Valência Média por Gênero',
+}
+
 # Cria gráfico de violino para mostrar a densidade dos dados
-fig_violin = px.violin(
-    df_filtrado,
+fig_violin = figura_violin(
+    df_selecao,
     x='track_genre',
     y='valence',
-    color='track_genre',
-    box=True,
-    points='outliers', # Mostra pontos discrepantes
-    title='Valência por Gênero (com outliers)',
+    nivel=nivel_violin,
+    title=titulos_violin[nivel_violin],
     labels={
         'valence': 'Valência (0=triste, 1=feliz)',
         'track_genre': 'Gênero'
@@ -232,7 +312,8 @@ fig_violin.update_layout(
     xaxis_title="Gênero Musical",
     yaxis_title="Valência (Positividade)"
 )
-st.plotly_chart(fig_violin, use_container_width=True)
+exibir_grafico(fig_violin, 'violin_valencia', use_container_width=True)
+indicar_nivel(nivel_violin, len(df_selecao), n_generos)
 
 st.divider()
 
@@ -254,22 +335,25 @@ st.subheader("Insights da Análise")
 
 col_insight1, col_insight2 = st.columns(2)
 
+# Médias por gênero da seleção (mesmas somas por célula usadas acima)
+medias_insights = medias_por_genero(agregado)
+
 # Cálculos para encontrar os campeões em cada categoria
 with col_insight1:
     # idxmax retorna o índice (nome do gênero) com o maior valor médio
-    genero_mais_dancavel = df_filtrado.groupby('track_genre')['danceability'].mean().idxmax()
-    valor_dancavel = df_filtrado.groupby('track_genre')['danceability'].mean().max()
+    genero_mais_dancavel = medias_insights['danceability'].idxmax()
+    valor_dancavel = medias_insights['danceability'].max()
     st.success(f"**Gênero mais dançante:** {genero_mais_dancavel} ({valor_dancavel:.2f})")
     
-    genero_mais_energetico = df_filtrado.groupby('track_genre')['energy'].mean().idxmax()
-    valor_energia = df_filtrado.groupby('track_genre')['energy'].mean().max()
+    genero_mais_energetico = medias_insights['energy'].idxmax()
+    valor_energia = medias_insights['energy'].max()
     st.info(f"**Gênero mais energético:** {genero_mais_energetico} ({valor_energia:.2f})")
 
 with col_insight2:
-    genero_mais_positivo = df_filtrado.groupby('track_genre')['valence'].mean().idxmax()
-    valor_valence = df_filtrado.groupby('track_genre')['valence'].mean().max()
+    genero_mais_positivo = medias_insights['valence'].idxmax()
+    valor_valence = medias_insights['valence'].max()
     st.success(f"**Gênero mais positivo:** {genero_mais_positivo} ({valor_valence:.2f})")
     
-    genero_mais_acustico = df_filtrado.groupby('track_genre')['acousticness'].mean().idxmax()
-    valor_acustico = df_filtrado.groupby('track_genre')['acousticness'].mean().max()
+    genero_mais_acustico = medias_insights['acousticness'].idxmax()
+    valor_acustico = medias_insights['acousticness'].max()
     st.info(f"**Gênero mais acústico:** {genero_mais_acustico} ({valor_acustico:.2f})")
\ No newline at end of file
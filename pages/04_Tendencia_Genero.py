@@ -1,6 +1,11 @@
 import streamlit as st
+import pandas as pd
 import plotly.express as px
 from utils.carrega_dados import carregar_dados
+from utils.figuras import exibir_grafico
+from utils.similaridade import carregar_similaridade, generos_proximos
+from utils.orcamento import escolher_nivel, indicar_nivel, figura_box
+from utils.analise_genero import kpis_genero, figura_histograma, figura_3d, top_faixas, perfil_medio
 
 # Configura as propriedades da página do navegador
 st.set_page_config(
@@ -15,7 +20,7 @@ st.title('Análise de Tendências por Gênero Musical')
 df = carregar_dados()
 
 # Cria a estrutura de navegação com abas para separar as diferentes visões do dashboard
-tab1, tab2, tab3 = st.tabs(["Rankings", "Comparações", "Análise Detalhada"])
+tab1, tab2, tab3, tab4 = st.tabs(["Rankings", "Comparações", "Análise Detalhada", "Similaridade"])
 
 with tab1:
     st.header("Rankings de Gêneros Musicais")
@@ -63,7 +68,7 @@ with tab1:
         yaxis={'categoryorder': 'total ascending'} 
     )
     # Renderiza o gráfico ocupando a largura da coluna
-    st.plotly_chart(fig_bar, use_container_width=True)
+    exibir_grafico(fig_bar, 'ranking_generos', use_container_width=True)
     
     # Linha divisória visual
     st.divider()
@@ -93,7 +98,7 @@ with tab1:
         height=500,
         title_x=0.5
     )
-    st.plotly_chart(fig_treemap, use_container_width=True)
+    exibir_grafico(fig_treemap, 'treemap_generos', use_container_width=True)
 
 with tab2:
     st.header("Comparação entre Gêneros")
@@ -161,7 +166,7 @@ with tab2:
         hovermode='x unified'
     )
     fig_line.update_xaxes(tickangle=45) # Inclina o texto do eixo X
-    st.plotly_chart(fig_line, use_container_width=True)
+    exibir_grafico(fig_line, 'perfil_comparativo', use_container_width=True)
     
     st.divider()
     
@@ -169,12 +174,14 @@ with tab2:
     st.subheader("Distribuição de Popularidade")
     
     # Cria boxplot para ver a dispersão da popularidade entre os gêneros escolhidos
-    fig_box_comp = px.box(
+    # Nível de detalhe conforme o tamanho da seleção
+    nivel_comp = escolher_nivel(len(df_comp), len(generos_comparar))
+    
+    fig_box_comp = figura_box(
         df_comp,
         x='track_genre',
         y='popularity',
-        color='track_genre',
-        points='outliers', # Mostra pontos fora da curva
+        nivel=nivel_comp,
         title='Comparação de Popularidade entre Gêneros',
         labels={
             'popularity': 'Popularidade (0-100)',
@@ -187,7 +194,8 @@ with tab2:
         title_x=0.5,
         showlegend=False # Remove legenda pois o eixo X já identifica os gêneros
     )
-    st.plotly_chart(fig_box_comp, use_container_width=True)
+    exibir_grafico(fig_box_comp, 'box_comparativo', use_container_width=True)
+    indicar_nivel(nivel_comp, len(df_comp), len(generos_comparar))
     
     # Tabela Resumo Comparativa
     st.subheader("Tabela Comparativa")
@@ -224,125 +232,111 @@ with tab3:
     df_genero = df[df['track_genre'] == genero_selecionado]
     
     # Exibe 5 métricas principais (KPIs) lado a lado
+    kpis = kpis_genero(df_genero)
     col1, col2, col3, col4, col5 = st.columns(5)
-    col1.metric("Total de Faixas", len(df_genero))
-    col2.metric("Popularidade Média", f"{df_genero['popularity'].mean():.1f}")
-    col3.metric("Duração Média", f"{df_genero['duration_min'].mean():.2f} min")
-    col4.metric("Artistas Únicos", df_genero['artists'].nunique())
-    # Calcula a porcentagem de músicas explícitas
-    col5.metric("% Explícito", f"{(df_genero['explicit'].sum()/len(df_genero)*100):.1f}%")
+    col1.metric("Total de Faixas", kpis['total_faixas'])
+    col2.metric("Popularidade Média", f"{kpis['popularidade_media']:.1f}")
+    col3.metric("Duração Média", f"{kpis['duracao_media']:.2f} min")
+    col4.metric("Artistas Únicos", kpis['artistas_unicos'])
+    col5.metric("% Explícito", f"{kpis['percentual_explicito']:.1f}%")
     
     st.divider()
     
     # Gráfico 5: Histograma de Popularidade
     st.subheader(f"Distribuição de Popularidade - {genero_selecionado}")
-    
-    fig_hist = px.histogram(
-        df_genero,
-        x='popularity',
-        nbins=30, 
-        title=f'Distribuição de Popularidade no gênero {genero_selecionado}',
-        labels={'popularity': 'Popularidade', 'count': 'Quantidade de Faixas'},
-        color_discrete_sequence=['#1DB954'] 
-    )
-    
-    # Adiciona uma linha vertical tracejada indicando a média
-    media_pop = df_genero['popularity'].mean()
-    fig_hist.add_vline(
-        x=media_pop,
-        line_dash="dash",
-        line_color="red",
-        annotation_text=f"Média: {media_pop:.1f}",
-        annotation_position="top"
-    )
-    
-    fig_hist.update_layout(height=400, title_x=0.5)
-    st.plotly_chart(fig_hist, use_container_width=True)
+    nivel_hist = escolher_nivel(len(df_genero))
+    exibir_grafico(figura_histograma(df_genero, genero_selecionado, nivel_hist), 'histograma_genero', use_container_width=True)
+    indicar_nivel(nivel_hist, len(df_genero))
     
     st.divider()
     
     # Gráfico 6: Scatter 3D (Dispersão Tridimensional)
     st.subheader(f"Análise 3D - {genero_selecionado}")
-    
-    # Realiza uma amostragem de no máximo 500 músicas
-    df_sample = df_genero.sample(min(500, len(df_genero)))
-    
-    fig_3d = px.scatter_3d(
-        df_sample,
-        x='danceability',
-        y='energy',
-        z='valence',
-        color='popularity',      
-        size='duration_min',     
-        hover_data=['track_name', 'artists'],
-        title=f'Espaço Tridimensional de Características - {genero_selecionado}',
-        labels={
-            'danceability': 'Dançabilidade',
-            'energy': 'Energia',
-            'valence': 'Valência',
-            'popularity': 'Popularidade'
-        },
-        color_continuous_scale='Turbo' 
-    )
-    
-    fig_3d.update_layout(
-        height=600,
-        title_x=0.5,
-        scene=dict( # Configurações específicas da cena 3D
-            xaxis_title='Dançabilidade',
-            yaxis_title='Energia',
-            zaxis_title='Valência'
-        )
-    )
-    st.plotly_chart(fig_3d, use_container_width=True)
+    exibir_grafico(figura_3d(df_genero, genero_selecionado), 'scatter_3d_genero', use_container_width=True)
     
     st.divider()
     
     st.subheader(f"Top 10 Faixas Mais Populares - {genero_selecionado}")
-    
-    # Seleciona as 10 maiores baseado na coluna popularity
-    df_top_tracks = (df_genero
-                     .nlargest(10, 'popularity')[['track_name', 'artists', 'popularity', 'duration_min']]
-                     .reset_index(drop=True))
-    
-    # Ajusta o índice para começar em 1 
-    df_top_tracks.index += 1
-    st.dataframe(df_top_tracks, use_container_width=True)
+    st.dataframe(top_faixas(df_genero), use_container_width=True)
     
     st.subheader("Perfil Musical Médio")
     
     col_perfil1, col_perfil2 = st.columns(2)
     
-    # Exibe métricas na coluna 
+    # Metade dos atributos em cada coluna
+    perfil = list(perfil_medio(df_genero).items())
     with col_perfil1:
-        caracteristicas_perfil = {
-            'Dançabilidade': df_genero['danceability'].mean(),
-            'Energia': df_genero['energy'].mean(),
-            'Valência': df_genero['valence'].mean(),
-            'Acusticidade': df_genero['acousticness'].mean(),
-        }
-        
-        for nome, valor in caracteristicas_perfil.items():
+        for nome, valor in perfil[:4]:
             st.metric(nome, f"{valor:.3f}")
     
     with col_perfil2:
-        caracteristicas_perfil2 = {
-            'Instrumentalidade': df_genero['instrumentalness'].mean(),
-            'Speechiness': df_genero['speechiness'].mean(),
-            'Liveness': df_genero['liveness'].mean(),
-            'Loudness': df_genero['loudness'].mean(),
-        }
-        
-        for nome, valor in caracteristicas_perfil2.items():
+        for nome, valor in perfil[4:]:
             if nome == 'Loudness':
                 st.metric(nome, f"{valor:.1f} dB")
             else:
                 st.metric(nome, f"{valor:.3f}")
 
+# --- Lógica da Aba 4: Similaridade entre todos os gêneros ---
+with tab4:
+    st.header("Quais gêneros soam parecidos?")
+    
+    # Matrizes pré-calculadas: só são refeitas quando o dataset muda
+    similaridade = carregar_similaridade()
+    
+    col_metrica, col_ordem = st.columns(2)
+    with col_metrica:
+        metrica_sim = st.radio(
+            "Comparar gêneros por",
+            options=['medias', 'distribuicao'],
+            format_func=lambda m: "Perfil médio" if m == 'medias' else "Distribuição dos atributos",
+            horizontal=True
+        )
+    with col_ordem:
+        ordenacao = st.radio(
+            "Ordenar o mapa de calor",
+            options=["Agrupamento hierárquico", "Alfabética"],
+            horizontal=True
+        )
+    
+    # Reordena linhas e colunas da matriz para aproximar os gêneros parecidos
+    generos_sim = similaridade['generos']
+    if ordenacao == "Agrupamento hierárquico":
+        ordem = similaridade[f'ordem_{metrica_sim}']
+    else:
+        ordem = list(range(len(generos_sim)))
+    matriz = similaridade[metrica_sim][ordem][:, ordem]
+    rotulos = [generos_sim[i] for i in ordem]
+    
+    fig_sim = px.imshow(
+        matriz,
+        x=rotulos,
+        y=rotulos,
+        color_continuous_scale='Viridis_r', # Cores escuras = gêneros parecidos
+        labels=dict(color="Distância"),
+        title='Distância entre Gêneros (menor = mais parecidos)'
+    )
+    fig_sim.update_layout(height=800, title_x=0.5)
+    fig_sim.update_xaxes(tickangle=45)
+    exibir_grafico(fig_sim, 'heatmap_similaridade', use_container_width=True)
+    
+    st.divider()
+    
+    st.subheader("Gêneros Mais Próximos")
+    genero_ref = st.selectbox("Escolha um gênero", options=generos_sim, key='genero_similaridade')
+    
+    df_proximos = pd.DataFrame(
+        generos_proximos(similaridade, genero_ref, metrica_sim),
+        columns=['Gênero', 'Distância']
+    )
+    # Ajusta o índice para começar em 1 
+    df_proximos.index += 1
+    st.dataframe(df_proximos.round(3), use_container_width=True)
+
 st.divider()
 
 st.info("""
 **Dica de Navegação:** - Use a aba **Rankings** para identificar os gêneros mais populares
 - A aba **Comparações** permite análise lado a lado de diferentes gêneros
 - **Análise Detalhada** oferece um mergulho profundo em um gênero específico
+- **Similaridade** mostra quais gêneros soam parecidos, entre todos os gêneros do dataset
 """)
\ No newline at end of file
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.selecao import (CARACTERISTICAS_CUBO, EIXO_X, EIXO_Y, agregar, calcular_cubo,
+                           dentro_regioes)
+
+
+@pytest.fixture(scope='module')
+def df():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    dados = {coluna: rng.random(n) for coluna in CARACTERISTICAS_CUBO}
+    dados['popularity'] = rng.integers(0, 101, n)
+    dados['track_genre'] = rng.choice(['rock', 'pop', 'jazz', 'samba'], n)
+    return pd.DataFrame(dados)
+
+
+def _laco(x, y):
+    return {'tipo': 'lasso', 'x': np.asarray(x, dtype=float), 'y': np.asarray(y, dtype=float)}
+
+
+REGIOES = {
+    'sem_selecao': [],
+    'caixa': [{'tipo': 'box', 'x': [0.21, 0.63], 'y': [0.12, 0.57]}],
+    'laco_convexo': [_laco([0.1, 0.8, 0.6, 0.2], [0.1, 0.2, 0.9, 0.7])],
+    # Entalhe fino descendo pelo meio de uma coluna de células, com os
+    # vértices de cima fora da grade: as células que ele atravessa têm os
+    # 4 cantos dentro do laço e nenhum vértice, mas não estão inteiras
+    'laco_concavo': [_laco([0.05, 0.95, 0.95, 0.5225, 0.5125, 0.5025, 0.05],
+                           [0.05, 0.05, 1.5, 1.5, 0.3, 1.5, 1.5])],
+    'caixa_e_laco': [{'tipo': 'box', 'x': [0.0, 0.3], 'y': [0.0, 0.3]},
+                     _laco([0.2, 0.9, 0.5], [0.2, 0.3, 0.95])],
+}
+
+
+@pytest.mark.parametrize('nome', list(REGIOES))
+def test_agregar_igual_a_mascara(df, nome):
+    regioes = REGIOES[nome]
+    agregado = agregar(calcular_cubo(df, ('teste',)), regioes)
+
+    if regioes:
+        mascara = dentro_regioes(df[EIXO_X], df[EIXO_Y], regioes)
+    else:
+        mascara = np.ones(len(df), dtype=bool)
+    esperado = df[mascara]
+
+    if regioes:
+        np.testing.assert_array_equal(agregado['posicoes'], np.flatnonzero(mascara))
+    else:
+        assert agregado['posicoes'] is None
+    contagem = esperado['track_genre'].value_counts().reindex(agregado['generos'], fill_value=0)
+    np.testing.assert_array_equal(agregado['contagem'], contagem.to_numpy())
+    somas = esperado.groupby('track_genre')[CARACTERISTICAS_CUBO].sum().reindex(agregado['generos'], fill_value=0)
+    np.testing.assert_allclose(agregado['somas'], somas.to_numpy(dtype=float))
+    valores = esperado[CARACTERISTICAS_CUBO].to_numpy(dtype=float)
+    np.testing.assert_allclose(agregado['produtos'], valores.T @ valores)
+
+
+def test_cubo_somente_leitura(df):
+    cubo = calcular_cubo(df, ('teste',))
+    for chave, valor in cubo.items():
+        if isinstance(valor, np.ndarray):
+            assert not valor.flags.writeable, chave
@@ -0,0 +1,109 @@
+import plotly.express as px
+
+from utils import orcamento
+
+# Cálculos da aba "Análise Detalhada" (página 04), separados da interface
+# para poderem ser reaproveitados pelos relatórios em lote
+
+# Atributos exibidos no perfil musical médio (nome exibido -> coluna)
+PERFIL_MEDIO = {
+    'Dançabilidade': 'danceability',
+    'Energia': 'energy',
+    'Valência': 'valence',
+    'Acusticidade': 'acousticness',
+    'Instrumentalidade': 'instrumentalness',
+    'Speechiness': 'speechiness',
+    'Liveness': 'liveness',
+    'Loudness': 'loudness',
+}
+
+
+def kpis_genero(df_genero):
+    """Métricas principais (KPIs) de um gênero."""
+    return {
+        'total_faixas': len(df_genero),
+        'popularidade_media': df_genero['popularity'].mean(),
+        'duracao_media': df_genero['duration_min'].mean(),
+        'artistas_unicos': df_genero['artists'].nunique(),
+        # Porcentagem de músicas explícitas
+        'percentual_explicito': df_genero['explicit'].sum() / len(df_genero) * 100,
+    }
+
+
+def figura_histograma(df_genero, genero, nivel='completo'):
+    """Histograma de popularidade com a linha da média.
+
+    Fora do nível 'completo' (ver utils/orcamento.py) as barras chegam
+    prontas do servidor, em vez de uma linha por faixa.
+    """
+    fig_hist = orcamento.figura_histograma(
+        df_genero,
+        x='popularity',
+        nivel=nivel,
+        nbins=30,
+        title=f'Distribuição de Popularidade no gênero {genero}',
+        labels={'popularity': 'Popularidade', 'count': 'Quantidade de Faixas'},
+        color_discrete_sequence=['#1DB954']
+    )
+
+    # Adiciona uma linha vertical tracejada indicando a média
+    media_pop = df_genero['popularity'].mean()
+    fig_hist.add_vline(
+        x=media_pop,
+        line_dash="dash",
+        line_color="red",
+        annotation_text=f"Média: {media_pop:.1f}",
+        annotation_position="top"
+    )
+
+    fig_hist.update_layout(height=400, title_x=0.5)
+    return fig_hist
+
+
+def figura_3d(df_genero, genero, amostra=500, semente=None):
+    """Dispersão 3D (dançabilidade, energia, valência) de uma amostra do gênero."""
+    # Realiza uma amostragem de no máximo `amostra` músicas
+    df_sample = df_genero.sample(min(amostra, len(df_genero)), random_state=semente)
+
+    fig_3d = px.scatter_3d(
+        df_sample,
+        x='danceability',
+        y='energy',
+        z='valence',
+        color='popularity',
+        size='duration_min',
+        hover_data=['track_name', 'artists'],
+        title=f'Espaço Tridimensional de Características - {genero}',
+        labels={
+            'danceability': 'Dançabilidade',
+            'energy': 'Energia',
+            'valence': 'Valência',
+            'popularity': 'Popularidade'
+        },
+        color_continuous_scale='Turbo'
+    )
+
+    fig_3d.update_layout(
+        height=600,
+        title_x=0.5,
+        scene=dict(  # Configurações específicas da cena 3D
+            xaxis_title='Dançabilidade',
+            yaxis_title='Energia',
+            zaxis_title='Valência'
+        )
+    )
+    return fig_3d
+
+
+def top_faixas(df_genero, n=10):
+    """As `n` faixas mais populares do gênero, com índice começando em 1."""
+    df_top_tracks = (df_genero
+                     .nlargest(n, 'popularity')[['track_name', 'artists', 'popularity', 'duration_min']]
+                     .reset_index(drop=True))
+    df_top_tracks.index += 1
+    return df_top_tracks
+
+
+def perfil_medio(df_genero):
+    """Média de cada atributo de `PERFIL_MEDIO` no gênero."""
+    return {nome: df_genero[coluna].mean() for nome, coluna in PERFIL_MEDIO.items()}
@@ -0,0 +1,252 @@
+import argparse
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+import platform
+import threading
+import time
+import zlib
+
+# Pasta onde os resultados calculados ficam guardados entre reinícios
+PASTA_ARMAZENAMENTO = os.environ.get('SPOTIFY_CACHE_DIR', os.path.join('.cache', 'resultados'))
+
+# Tamanho máximo ocupado em disco; os menos usados saem primeiro
+LIMITE_BYTES = int(os.environ.get('SPOTIFY_CACHE_LIMITE_MB', 512)) * 1024 ** 2
+
+# Aumentar quando o formato dos arquivos gravados mudar
+VERSAO_FORMATO = 1
+
+NOME_MANIFESTO = 'manifesto.json'
+
+log = logging.getLogger(__name__)
+
+_trava = threading.Lock()
+_impressoes = {}
+
+# Marca "não encontrado", já que None pode ser um resultado válido
+_AUSENTE = object()
+
+
+def _hash_arquivo(caminho):
+    resumo = hashlib.sha1()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1024 ** 2), b''):
+            resumo.update(bloco)
+    return resumo.hexdigest()
+
+
+def impressao_dataset(caminho=None):
+    """Hash do conteúdo do dataset, recalculado só se o arquivo mudar."""
+    if caminho is None:
+        from utils.carrega_dados import CAMINHO_ARQUIVO
+        caminho = CAMINHO_ARQUIVO
+    estado = os.stat(caminho)
+    chave = (os.path.abspath(caminho), estado.st_size, estado.st_mtime_ns)
+    if chave not in _impressoes:
+        _impressoes[chave] = _hash_arquivo(caminho)
+    return _impressoes[chave]
+
+
+def versao_codigo(funcao):
+    """Hash do código que produz o resultado.
+
+    Inclui o módulo da função e o carrega_dados.py, já que todo resultado
+    depende do tratamento feito no carregamento, e as versões do Python, do
+    pandas e do numpy, cujos objetos podem não ser lidos por outra versão.
+    """
+    import numpy
+    import pandas
+    import utils.carrega_dados
+    modulo = os.path.abspath(funcao.__code__.co_filename)
+    arquivos = sorted({modulo, os.path.abspath(utils.carrega_dados.__file__)})
+    versoes = (VERSAO_FORMATO, platform.python_version(), pandas.__version__, numpy.__version__)
+    resumo = hashlib.sha1(repr(versoes).encode('utf-8'))
+    for caminho in arquivos:
+        resumo.update(_hash_arquivo(caminho).encode('utf-8'))
+    return resumo.hexdigest()
+
+
+def _caminho_manifesto():
+    return os.path.join(PASTA_ARMAZENAMENTO, NOME_MANIFESTO)
+
+
+def _ler_manifesto():
+    try:
+        with open(_caminho_manifesto(), encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return {}
+
+
+def _salvar_manifesto(manifesto):
+    caminho = _caminho_manifesto()
+    with open(caminho + '.parcial', 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, indent=2, sort_keys=True)
+    os.replace(caminho + '.parcial', caminho)
+
+
+def _caminho_entrada(chave):
+    return os.path.join(PASTA_ARMAZENAMENTO, chave + '.bin')
+
+
+def ler(chave):
+    """Devolve o valor guardado para `chave`, ou `_AUSENTE`."""
+    caminho = _caminho_entrada(chave)
+    try:
+        with open(caminho, 'rb') as arquivo:
+            dados = arquivo.read()
+    except OSError:
+        return _AUSENTE
+    try:
+        valor = pickle.loads(zlib.decompress(dados))
+    except Exception:
+        # Arquivo corrompido ou gravado por outra versão de uma biblioteca
+        # (AttributeError, ModuleNotFoundError, TypeError...): vira um
+        # resultado ausente e a entrada é descartada
+        log.warning("armazenamento: entrada %s ilegível, descartada", chave, exc_info=True)
+        _descartar(chave)
+        return _AUSENTE
+
+    with _trava:
+        manifesto = _ler_manifesto()
+        if chave in manifesto:
+            manifesto[chave]['acessado'] = time.time()
+            _salvar_manifesto(manifesto)
+    return valor
+
+
+def _descartar(chave):
+    with _trava:
+        try:
+            os.remove(_caminho_entrada(chave))
+        except OSError:
+            pass
+        manifesto = _ler_manifesto()
+        if manifesto.pop(chave, None) is not None:
+            _salvar_manifesto(manifesto)
+
+
+def gravar(chave, valor, **info):
+    """Grava `valor` comprimido em disco e remove entradas antigas se passar do limite."""
+    dados = zlib.compress(pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL), 1)
+    if len(dados) > LIMITE_BYTES:
+        log.warning("resultado %s maior que o limite do armazenamento, não gravado", info.get('nome', chave))
+        return
+
+    with _trava:
+        os.makedirs(PASTA_ARMAZENAMENTO, exist_ok=True)
+        caminho = _caminho_entrada(chave)
+        with open(caminho + '.parcial', 'wb') as arquivo:
+            arquivo.write(dados)
+        os.replace(caminho + '.parcial', caminho)
+
+        manifesto = _ler_manifesto()
+        agora = time.time()
+        manifesto[chave] = dict(info, tamanho=len(dados), criado=agora, acessado=agora)
+        _remover_excesso(manifesto)
+        _salvar_manifesto(manifesto)
+
+
+def _incluir_orfaos(manifesto):
+    # Arquivos .bin que não estão no manifesto (manifesto apagado ou
+    # corrompido) entram com a data de modificação como último acesso,
+    # para também contarem no limite
+    for nome in os.listdir(PASTA_ARMAZENAMENTO):
+        chave, extensao = os.path.splitext(nome)
+        if extensao != '.bin' or chave in manifesto:
+            continue
+        try:
+            estado = os.stat(os.path.join(PASTA_ARMAZENAMENTO, nome))
+        except OSError:
+            continue
+        manifesto[chave] = dict(tamanho=estado.st_size, criado=estado.st_mtime, acessado=estado.st_mtime)
+
+
+def _remover_excesso(manifesto):
+    _incluir_orfaos(manifesto)
+    total = sum(entrada['tamanho'] for entrada in manifesto.values())
+    # Remove as entradas acessadas há mais tempo até caber no limite
+    for chave in sorted(manifesto, key=lambda c: manifesto[c]['acessado']):
+        if total <= LIMITE_BYTES:
+            break
+        total -= manifesto.pop(chave)['tamanho']
+        try:
+            os.remove(_caminho_entrada(chave))
+        except OSError:
+            pass
+        log.info("armazenamento: removida entrada %s", chave)
+
+
+def limpar():
+    """Apaga todos os resultados guardados e devolve quantos eram."""
+    with _trava:
+        if not os.path.isdir(PASTA_ARMAZENAMENTO):
+            return 0
+        manifesto = _ler_manifesto()
+        _incluir_orfaos(manifesto)
+        for chave in manifesto:
+            try:
+                os.remove(_caminho_entrada(chave))
+            except OSError:
+                pass
+        _salvar_manifesto({})
+        return len(manifesto)
+
+
+def persistente(funcao):
+    """Guarda em disco o resultado da função, para sobreviver a reinícios.
+
+    A chave combina o nome da função, seus argumentos, a impressão digital
+    do dataset e a versão do código. Pode ser usado por baixo de
+    `@st.cache_data`/`@st.cache_resource`: a memória atende os reruns e o
+    disco atende o primeiro acesso depois de um reinício.
+    """
+    @functools.wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        nome = f'{funcao.__module__}.{funcao.__qualname__}'
+        impressao = impressao_dataset()
+        versao = versao_codigo(funcao)
+        chave = hashlib.sha1(
+            repr((nome, args, sorted(kwargs.items()), impressao, versao)).encode('utf-8')
+        ).hexdigest()
+
+        valor = ler(chave)
+        if valor is not _AUSENTE:
+            log.debug("armazenamento: %s lido do disco", nome)
+            return valor
+
+        valor = funcao(*args, **kwargs)
+        try:
+            gravar(chave, valor, nome=nome, dataset=impressao, versao=versao)
+        except OSError:
+            # Sem permissão de escrita, por exemplo; o app segue sem o disco
+            log.warning("armazenamento: não foi possível gravar %s", nome, exc_info=True)
+        return valor
+
+    return envoltorio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mostra ou apaga os resultados guardados em disco.")
+    parser.add_argument('--limpar', action='store_true', help="Apaga todos os resultados guardados")
+    args = parser.parse_args(argv)
+
+    if args.limpar:
+        print(f"{limpar()} resultados apagados de {PASTA_ARMAZENAMENTO}")
+        return
+
+    manifesto = _ler_manifesto()
+    if os.path.isdir(PASTA_ARMAZENAMENTO):
+        _incluir_orfaos(manifesto)
+    total = sum(entrada['tamanho'] for entrada in manifesto.values())
+    print(f"{len(manifesto)} resultados em {PASTA_ARMAZENAMENTO}: "
+          f"{total / 1024 ** 2:.1f} MB de {LIMITE_BYTES / 1024 ** 2:.0f} MB")
+    for chave, entrada in sorted(manifesto.items(), key=lambda item: -item[1]['acessado']):
+        print(f"  {entrada.get('nome', chave):<45} {entrada['tamanho'] / 1024 ** 2:>8.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
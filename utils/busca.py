@@ -0,0 +1,130 @@
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+import streamlit as st
+
+from utils.armazenamento import persistente
+from utils.carrega_dados import carregar_dados
+
+# Campos de texto indexados para a busca
+CAMPOS_BUSCA = ['track_name', 'artists', 'album_name']
+
+# Tamanho dos n-gramas do índice invertido; consultas menores que isso
+# usam os n-gramas curtos (1 e 2 caracteres), também indexados
+TAMANHO_NGRAMA = 3
+
+# Separa os campos de uma linha; nunca aparece numa consulta normalizada,
+# então nenhum n-grama "atravessa" de um campo para outro
+SEPARADOR = '\n'
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos, para a busca ignorar essas diferenças."""
+    texto = unicodedata.normalize('NFKD', str(texto).lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def _ngramas(texto, tamanho=TAMANHO_NGRAMA):
+    return {
+        texto[i:i + tamanho]
+        for i in range(len(texto) - tamanho + 1)
+        if SEPARADOR not in texto[i:i + tamanho]
+    }
+
+
+class IndiceBusca:
+    """Índice invertido de n-gramas sobre os campos de texto das faixas.
+
+    Toda consulta é uma busca por substring. Com pelo menos
+    `TAMANHO_NGRAMA` caracteres, as listas de posições dos n-gramas da
+    consulta são intersectadas e os candidatos conferidos no texto.
+    Consultas menores são elas mesmas um n-grama curto e são respondidas
+    direto pela sua lista. Todas as posições se referem às linhas do
+    DataFrame indexado.
+    """
+
+    def __init__(self, df):
+        self.textos = [
+            SEPARADOR.join(normalizar(v) for v in valores)
+            for valores in zip(*(df[campo].tolist() for campo in CAMPOS_BUSCA))
+        ]
+
+        postagens = defaultdict(list)
+        postagens_curtas = defaultdict(list)
+        for posicao, texto in enumerate(self.textos):
+            for ngrama in _ngramas(texto):
+                postagens[ngrama].append(posicao)
+            for tamanho in range(1, TAMANHO_NGRAMA):
+                for ngrama in _ngramas(texto, tamanho):
+                    postagens_curtas[ngrama].append(posicao)
+
+        # As posições já entram em ordem crescente, o que permite intersectar
+        # as listas sem reordenar
+        self.ngramas = {
+            ngrama: np.array(posicoes, dtype=np.int32)
+            for ngrama, posicoes in postagens.items()
+        }
+        self.ngramas_curtos = {
+            ngrama: np.array(posicoes, dtype=np.int32)
+            for ngrama, posicoes in postagens_curtas.items()
+        }
+
+    def __len__(self):
+        return len(self.textos)
+
+    def tamanho_bytes(self):
+        """Memória aproximada ocupada pelas listas de posições."""
+        total = sum(p.nbytes for p in self.ngramas.values())
+        total += sum(p.nbytes for p in self.ngramas_curtos.values())
+        return total
+
+    def buscar(self, consulta):
+        """Devolve as posições (ordenadas) das linhas que casam com a consulta."""
+        consulta = normalizar(consulta).strip()
+        if not consulta:
+            return np.arange(len(self.textos), dtype=np.int32)
+        if len(consulta) < TAMANHO_NGRAMA:
+            # A lista do n-grama curto já é exatamente o resultado
+            return self.ngramas_curtos.get(consulta, np.empty(0, dtype=np.int32))
+        return self._buscar_substring(consulta)
+
+    def _buscar_substring(self, consulta):
+        listas = []
+        for ngrama in _ngramas(consulta):
+            posicoes = self.ngramas.get(ngrama)
+            if posicoes is None:
+                return np.empty(0, dtype=np.int32)
+            listas.append(posicoes)
+
+        # Começa pelas listas menores para a interseção encolher rápido
+        listas.sort(key=len)
+        candidatos = listas[0]
+        for posicoes in listas[1:]:
+            candidatos = np.intersect1d(candidatos, posicoes, assume_unique=True)
+            if len(candidatos) == 0:
+                return candidatos
+
+        # Os n-gramas podem aparecer fora de ordem; confirma no texto
+        return np.array(
+            [p for p in candidatos if consulta in self.textos[p]],
+            dtype=np.int32
+        )
+
+
+@st.cache_resource(show_spinner="Construindo índice de busca...")
+@persistente
+def carregar_indice_busca():
+    """Constrói o índice uma vez por servidor, sobre o DataFrame de `carregar_dados()`."""
+    return IndiceBusca(carregar_dados())
+
+
+def filtrar_por_busca(df, df_filtrado, consulta):
+    """Aplica a busca de texto sobre uma seleção já filtrada de `df`."""
+    # Carrega o índice já na abertura da página, mesmo sem consulta, para a
+    # primeira busca não esperar a construção
+    indice = carregar_indice_busca()
+    if not consulta or not consulta.strip():
+        return df_filtrado
+    posicoes = indice.buscar(consulta)
+    return df_filtrado[df_filtrado.index.isin(df.index[posicoes])]
@@ -1,11 +1,19 @@
 import pandas as pd
 import streamlit as st
 import os
+from utils.armazenamento import persistente
 
+CAMINHO_ARQUIVO = './dataset/dataset.csv'
+
+# O cache em memória atende os reruns; o persistente evita reprocessar o CSV
+# depois de um reinício do servidor
 @st.cache_data
+@persistente
 def carregar_dados():
-    caminho_arquivo = './dataset/dataset.csv'
-  
+    return preparar_dados(CAMINHO_ARQUIVO)
+
+def preparar_dados(caminho_arquivo):
+    # Versão sem cache, usada também fora do Streamlit (relatórios em lote)
     df_original = pd.read_csv(caminho_arquivo)
     
     df = df_original.copy()
@@ -0,0 +1,144 @@
+import hashlib
+import logging
+import os
+import tempfile
+
+import streamlit as st
+
+from utils.armazenamento import impressao_dataset
+
+# Quantidade de linhas escritas por vez no arquivo de exportação
+TAMANHO_BLOCO = 10_000
+
+# Pasta temporária onde os arquivos exportados ficam guardados
+PASTA_EXPORTACAO = os.path.join(tempfile.gettempdir(), 'spotify_exportacao')
+
+# Tamanho máximo da pasta; os arquivos usados há mais tempo saem primeiro
+LIMITE_BYTES = int(os.environ.get('SPOTIFY_EXPORTACAO_LIMITE_MB', 256)) * 1024 ** 2
+
+log = logging.getLogger(__name__)
+
+FORMATOS = {
+    'csv': ('CSV', 'text/csv'),
+    'parquet': ('Parquet', 'application/octet-stream'),
+}
+
+
+def _caminho_arquivo(chave_filtros, formato):
+    # Gera um nome de arquivo fixo para cada combinação de filtros e versão
+    # do dataset, para não reaproveitar um arquivo de dados antigos
+    identificacao = repr((chave_filtros, impressao_dataset()))
+    resumo = hashlib.sha1(identificacao.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(PASTA_EXPORTACAO, f'selecao_{resumo}.{formato}')
+
+
+def _escrever_csv(df, posicoes, caminho):
+    with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+        for inicio in range(0, len(posicoes), TAMANHO_BLOCO):
+            bloco = df.iloc[posicoes[inicio:inicio + TAMANHO_BLOCO]]
+            # O cabeçalho só é escrito no primeiro bloco
+            bloco.to_csv(arquivo, header=(inicio == 0), index=False)
+
+
+def _escrever_parquet(df, posicoes, caminho):
+    # pyarrow já é instalado junto com o Streamlit
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    with pq.ParquetWriter(caminho, esquema) as escritor:
+        for inicio in range(0, len(posicoes), TAMANHO_BLOCO):
+            bloco = df.iloc[posicoes[inicio:inicio + TAMANHO_BLOCO]]
+            # Cada bloco vira um "row group" separado no arquivo
+            escritor.write_table(
+                pa.Table.from_pandas(bloco, schema=esquema, preserve_index=False)
+            )
+
+
+def _remover_excesso(manter):
+    # Remove os arquivos usados há mais tempo até a pasta caber no limite,
+    # sem apagar `manter`, que acabou de ser pedido
+    arquivos = []
+    for nome in os.listdir(PASTA_EXPORTACAO):
+        if nome.endswith('.parcial'):
+            # Arquivo ainda sendo escrito por outra sessão
+            continue
+        caminho = os.path.join(PASTA_EXPORTACAO, nome)
+        try:
+            estado = os.stat(caminho)
+        except OSError:
+            continue
+        arquivos.append((estado.st_mtime, estado.st_size, caminho))
+
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+    for _, tamanho, caminho in sorted(arquivos):
+        if total <= LIMITE_BYTES:
+            break
+        if caminho == manter:
+            continue
+        try:
+            os.remove(caminho)
+        except OSError:
+            continue
+        total -= tamanho
+        log.info("exportação: removido %s", caminho)
+
+
+def preparar_exportacao(df, posicoes, chave_filtros, formato):
+    """Escreve a seleção filtrada em disco, bloco a bloco, e devolve o caminho.
+
+    O nome do arquivo vem do estado dos filtros, então cada combinação de
+    filtros é exportada uma única vez e reaproveitada pelas outras sessões
+    enquanto estiver na pasta, que é limitada a `LIMITE_BYTES`.
+    """
+    os.makedirs(PASTA_EXPORTACAO, exist_ok=True)
+    caminho = _caminho_arquivo(chave_filtros, formato)
+    if os.path.exists(caminho):
+        # Marca como usado agora, para sair por último da pasta
+        os.utime(caminho)
+        return caminho
+
+    # Escreve num arquivo temporário e renomeia no final, para que uma
+    # sessão nunca leia um arquivo pela metade
+    descritor, caminho_parcial = tempfile.mkstemp(dir=PASTA_EXPORTACAO, suffix='.parcial')
+    os.close(descritor)
+    try:
+        if formato == 'parquet':
+            _escrever_parquet(df, posicoes, caminho_parcial)
+        else:
+            _escrever_csv(df, posicoes, caminho_parcial)
+        os.replace(caminho_parcial, caminho)
+    finally:
+        if os.path.exists(caminho_parcial):
+            os.remove(caminho_parcial)
+
+    _remover_excesso(manter=caminho)
+    return caminho
+
+
+def botoes_exportacao(df, df_filtrado, chave_filtros):
+    """Mostra a opção de download (CSV ou Parquet) da seleção filtrada."""
+    formato = st.radio(
+        "Exportar seleção",
+        options=list(FORMATOS),
+        format_func=lambda f: FORMATOS[f][0],
+        horizontal=True,
+    )
+
+    def gerar_arquivo():
+        # Só roda quando o usuário clica no botão: arrastar um filtro não
+        # escreve nada e o arquivo não fica na memória a cada rerun. No
+        # clique, o Streamlit guarda os bytes devolvidos na memória para
+        # servi-los (limite descrito no README)
+        posicoes = df.index.get_indexer(df_filtrado.index)
+        caminho = preparar_exportacao(df, posicoes, chave_filtros, formato)
+        with open(caminho, 'rb') as arquivo:
+            return arquivo.read()
+
+    nome, mime = FORMATOS[formato]
+    st.download_button(
+        f"Baixar {len(df_filtrado)} faixas ({nome})",
+        data=gerar_arquivo,
+        file_name=f'spotify_selecao.{formato}',
+        mime=mime,
+    )
@@ -0,0 +1,147 @@
+import logging
+import os
+import re
+
+import numpy as np
+import plotly
+import plotly.io as pio
+import streamlit as st
+
+# Casas decimais mantidas nos valores dos gráficos; os atributos do
+# dataset vão de 0 a 1, então 3 casas já passam da resolução da tela
+CASAS_DECIMAIS = 3
+
+# Atributos numéricos, por ponto, que são arredondados
+ATRIBUTOS_NUMERICOS = ['x', 'y', 'z', 'r', 'marker.size', 'marker.color']
+
+# Atributos que o hover formata pelo eixo e que, por isso, podem ir em
+# float32. Os demais (`%{marker.size}`, `%{r}`...) aparecem no hover sem
+# formatação, e um float32 seria mostrado como 3.8489999771118164
+ATRIBUTOS_FLOAT32 = {'x', 'y', 'z'}
+
+# A partir do plotly 6, arrays numpy são enviados como "typed arrays"
+# binários (base64); antes disso viram listas JSON, e um float32 ocuparia
+# mais texto que o float64 arredondado
+ARRAYS_BINARIOS = int(plotly.__version__.split('.')[0]) >= 6
+
+# Medir o payload serializa a figura mais uma vez a cada rerun; por isso só
+# é feito quando ativado (SPOTIFY_MEDIR_PAYLOAD=1), para diagnóstico
+MEDIR_PAYLOAD = os.environ.get('SPOTIFY_MEDIR_PAYLOAD', '') not in ('', '0')
+
+log = logging.getLogger(__name__)
+
+_CUSTOMDATA = re.compile(r'%\{customdata\[(\d+)\]')
+
+
+def _compactar_valores(valores, casas, float32):
+    if isinstance(valores, (list, tuple)):
+        valores = np.asarray(valores)
+    if not isinstance(valores, np.ndarray) or valores.dtype.kind != 'f':
+        return None
+    valores = np.round(valores, casas)
+    return valores.astype(np.float32) if float32 and ARRAYS_BINARIOS else valores
+
+
+def _ler_atributo(trace, atributo):
+    # Nem todo tipo de trace tem todos os atributos (ex.: pie não tem x)
+    return trace[atributo] if atributo in trace else None
+
+
+def _mesmos_valores(coluna, valores):
+    if not isinstance(valores, np.ndarray) or valores.dtype.kind not in 'fiu':
+        return False
+    if len(coluna) != len(valores):
+        return False
+    try:
+        return np.array_equal(coluna.astype(valores.dtype), valores)
+    except (TypeError, ValueError):
+        # Coluna de texto (nome da música, artista...)
+        return False
+
+
+def _remover_hover_redundante(trace):
+    """Tira do customdata as colunas que repetem um atributo do próprio trace.
+
+    O plotly express copia para o customdata toda coluna de `hover_data`,
+    mesmo quando ela já é o `size` ou a `color` do gráfico. O texto do
+    hover passa a ler o atributo original.
+    """
+    customdata = trace.customdata
+    hovertemplate = trace.hovertemplate
+    if customdata is None or hovertemplate is None or np.ndim(customdata) != 2:
+        return
+
+    customdata = np.asarray(customdata, dtype=object)
+    substitutos = {}
+    for coluna in range(customdata.shape[1]):
+        for atributo in ATRIBUTOS_NUMERICOS:
+            if _mesmos_valores(customdata[:, coluna], _ler_atributo(trace, atributo)):
+                substitutos[coluna] = atributo
+                break
+    if not substitutos:
+        return
+
+    mantidas = [c for c in range(customdata.shape[1]) if c not in substitutos]
+    nova_posicao = {antiga: nova for nova, antiga in enumerate(mantidas)}
+
+    def trocar(match):
+        coluna = int(match.group(1))
+        if coluna in substitutos:
+            return '%{' + substitutos[coluna]
+        return f'%{{customdata[{nova_posicao[coluna]}]'
+
+    trace.hovertemplate = _CUSTOMDATA.sub(trocar, hovertemplate)
+    trace.customdata = customdata[:, mantidas] if mantidas else None
+
+
+def _remover_categoria_repetida(trace):
+    # Em box/violin com um gênero por trace, o eixo X repete o mesmo texto
+    # em todos os pontos; basta informar a posição uma vez em `x0`
+    if trace.type not in ('box', 'violin') or trace.orientation == 'h':
+        return
+    x = trace.x
+    if x is None or len(x) == 0 or np.asarray(x).dtype.kind in 'fiu':
+        return
+    valores = np.unique(np.asarray(x, dtype=object).astype(str))
+    if len(valores) == 1:
+        trace.x = None
+        trace.x0 = valores[0]
+
+
+def compactar_figura(fig, casas=CASAS_DECIMAIS):
+    """Reduz o JSON de uma figura antes de enviá-la ao navegador.
+
+    Arredonda os valores por ponto para `casas` decimais (as coordenadas em
+    float32 quando o plotly envia arrays binários), remove colunas de hover
+    repetidas e o rótulo de categoria repetido em box/violin. Altera e
+    devolve `fig`.
+    """
+    for trace in fig.data:
+        _remover_hover_redundante(trace)
+        _remover_categoria_repetida(trace)
+        for atributo in ATRIBUTOS_NUMERICOS:
+            valores = _compactar_valores(_ler_atributo(trace, atributo), casas,
+                                         float32=atributo in ATRIBUTOS_FLOAT32)
+            if valores is not None:
+                trace[atributo] = valores
+    return fig
+
+
+def tamanho_payload(fig):
+    """Bytes do JSON que o Streamlit envia para desenhar a figura."""
+    return len(pio.to_json(fig, validate=False).encode('utf-8'))
+
+
+def exibir_grafico(fig, nome, **kwargs):
+    """Compacta a figura e a exibe, registrando o tamanho do payload se ativado.
+
+    Com `MEDIR_PAYLOAD`, os tamanhos ficam em
+    `st.session_state['payload_graficos']`, por nome de gráfico, e também
+    vão para o log.
+    """
+    compactar_figura(fig)
+    if MEDIR_PAYLOAD:
+        tamanho = tamanho_payload(fig)
+        st.session_state.setdefault('payload_graficos', {})[nome] = tamanho
+        log.info("gráfico %s: %d bytes", nome, tamanho)
+    st.plotly_chart(fig, **kwargs)
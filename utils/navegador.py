@@ -0,0 +1,117 @@
+import math
+
+import numpy as np
+import streamlit as st
+
+from utils.armazenamento import persistente
+from utils.carrega_dados import carregar_dados
+
+# Colunas que podem ser usadas para ordenar o navegador
+COLUNAS_ORDENAVEIS = [
+    'track_name', 'artists', 'album_name', 'track_genre', 'popularity',
+    'duration_min', 'danceability', 'energy', 'valence', 'tempo',
+]
+
+# Colunas exibidas por padrão
+COLUNAS_PADRAO = ['track_name', 'artists', 'album_name', 'track_genre', 'popularity', 'duration_min']
+
+TAMANHOS_PAGINA = [10, 25, 50, 100]
+
+# Nomes amigáveis e formatação das colunas mais comuns
+CONFIG_COLUNAS = {
+    "track_name": "Música",
+    "artists": "Artista",
+    "album_name": "Álbum",
+    "track_genre": "Gênero",
+    "popularity": st.column_config.ProgressColumn(
+        "Popularidade", format="%d", min_value=0, max_value=100
+    ),
+}
+
+
+def _chave_ordenacao(serie):
+    # Texto é ordenado sem diferenciar maiúsculas de minúsculas
+    if serie.dtype == object or serie.dtype == 'string':
+        return serie.str.casefold()
+    return serie
+
+
+@st.cache_resource(show_spinner=False)
+@persistente
+def carregar_ordens():
+    """Pré-calcula, uma vez por servidor, as permutações ordenadas de cada coluna.
+
+    Há uma permutação por coluna e sentido, indexada por `(coluna, crescente)`.
+    A decrescente é calculada à parte (e não invertendo a crescente) para
+    que empates continuem na ordem do arquivo. As posições se referem ao
+    DataFrame devolvido por `carregar_dados()`.
+    """
+    df = carregar_dados()
+    ordens = {}
+    for coluna in COLUNAS_ORDENAVEIS:
+        chave = _chave_ordenacao(df[coluna]).reset_index(drop=True)
+        for crescente in (True, False):
+            ordens[coluna, crescente] = (
+                chave.sort_values(ascending=crescente, kind='stable').index.to_numpy(dtype=np.int32)
+            )
+    return ordens
+
+
+def pagina_dados(df, ordens, coluna_ordem, crescente, numero_pagina, tamanho_pagina, colunas):
+    """Devolve só as linhas visíveis de uma página.
+
+    Fatiar a permutação pré-calculada custa o mesmo para qualquer tamanho
+    de dataset; nenhuma ordenação é feita a cada interação.
+    """
+    inicio = (numero_pagina - 1) * tamanho_pagina
+    fim = inicio + tamanho_pagina
+
+    if coluna_ordem is None:
+        # Ordem original do arquivo
+        posicoes = np.arange(inicio, min(fim, len(df)))
+    else:
+        posicoes = ordens[coluna_ordem, crescente][inicio:fim]
+
+    return df.iloc[posicoes, df.columns.get_indexer(colunas)]
+
+
+def navegador_dados(df):
+    """Navegador paginado e ordenável, processado no servidor."""
+    ordens = carregar_ordens()
+
+    col_ordem, col_sentido, col_tamanho, col_pagina = st.columns([2, 1, 1, 1])
+    with col_ordem:
+        coluna_ordem = st.selectbox(
+            "Ordenar por",
+            options=[None] + COLUNAS_ORDENAVEIS,
+            format_func=lambda c: "Ordem original" if c is None else c,
+        )
+    with col_sentido:
+        sentido = st.radio("Sentido", ["Decrescente", "Crescente"], horizontal=True)
+    with col_tamanho:
+        tamanho_pagina = st.selectbox("Linhas por página", TAMANHOS_PAGINA)
+
+    total_paginas = max(1, math.ceil(len(df) / tamanho_pagina))
+    with col_pagina:
+        numero_pagina = st.number_input("Página", min_value=1, max_value=total_paginas, value=1, step=1)
+
+    colunas = st.multiselect(
+        "Colunas exibidas",
+        options=df.columns.tolist(),
+        default=COLUNAS_PADRAO,
+    )
+    if not colunas:
+        st.warning("Selecione pelo menos uma coluna")
+        return
+
+    df_pagina = pagina_dados(
+        df, ordens, coluna_ordem, sentido == "Crescente",
+        int(numero_pagina), tamanho_pagina, colunas
+    )
+    st.dataframe(df_pagina, use_container_width=True, column_config=CONFIG_COLUNAS)
+
+    inicio = (int(numero_pagina) - 1) * tamanho_pagina
+    st.caption(
+        f"Mostrando linhas {inicio + 1} a {inicio + len(df_pagina)} de {len(df)} registros "
+        f"(página {int(numero_pagina)} de {total_paginas})."
+    )
@@ -0,0 +1,180 @@
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+# Metas do "orçamento" de cada gráfico: tempo de desenho no navegador e
+# tamanho do payload. Podem ser ajustadas por variável de ambiente.
+LATENCIA_ALVO_MS = float(os.environ.get('SPOTIFY_LATENCIA_ALVO_MS', 400))
+PAYLOAD_ALVO_KB = float(os.environ.get('SPOTIFY_PAYLOAD_ALVO_KB', 500))
+
+# Custos estimados (medidos com benchmarks/bench_payload.py, já com a
+# compactação de utils/figuras.py)
+BYTES_POR_PONTO = 8
+BYTES_POR_GRUPO = 1200
+MS_POR_MIL_PONTOS = 5
+MS_POR_GRUPO = 2
+
+# Pontos enviados por grupo no nível "outliers_limitados"
+PONTOS_POR_GRUPO = 200
+
+# Máximo de grupos (traces) no nível "agregado" e no radar
+LIMITE_GRUPOS = 15
+
+# Do mais detalhado para o mais resumido
+NIVEIS = ['completo', 'outliers_limitados', 'pre_agrupado', 'agregado']
+
+DESCRICAO_NIVEL = {
+    'completo': "todos os pontos",
+    'outliers_limitados': f"amostra de até {PONTOS_POR_GRUPO} pontos por grupo",
+    'pre_agrupado': "estatísticas calculadas no servidor, sem pontos individuais",
+    'agregado': "apenas médias por grupo",
+}
+
+
+def _cabe(pontos, grupos):
+    payload = pontos * BYTES_POR_PONTO + grupos * BYTES_POR_GRUPO
+    latencia = pontos / 1000 * MS_POR_MIL_PONTOS + grupos * MS_POR_GRUPO
+    return payload <= PAYLOAD_ALVO_KB * 1024 and latencia <= LATENCIA_ALVO_MS
+
+
+def escolher_nivel(linhas, grupos=1):
+    """Escolhe o nível de detalhe que cabe no orçamento para a seleção."""
+    if _cabe(linhas, grupos):
+        return 'completo'
+    if _cabe(min(linhas, grupos * PONTOS_POR_GRUPO), grupos):
+        return 'outliers_limitados'
+    if _cabe(0, grupos):
+        return 'pre_agrupado'
+    return 'agregado'
+
+
+def indicar_nivel(nivel, linhas, grupos=1):
+    """Avisa abaixo do gráfico quando o detalhe foi reduzido."""
+    if nivel != 'completo':
+        descricao = DESCRICAO_NIVEL[nivel]
+        if nivel == 'agregado' and grupos > LIMITE_GRUPOS:
+            # `_barras_agregadas` só mantém os grupos com mais faixas
+            descricao += f" dos {LIMITE_GRUPOS} de {grupos} grupos com mais faixas"
+        st.caption(
+            f"Detalhe reduzido para manter o gráfico leve ({linhas} faixas em {grupos} grupos): "
+            f"{descricao}."
+        )
+
+
+def amostra_por_grupo(df, coluna_grupo, limite=PONTOS_POR_GRUPO, semente=0):
+    """Amostra estratificada: no máximo `limite` linhas de cada grupo."""
+    # Embaralhar e pegar as primeiras linhas de cada grupo equivale a
+    # sortear sem reposição dentro de cada grupo
+    return (df.sample(frac=1, random_state=semente)
+              .groupby(coluna_grupo, observed=True)
+              .head(limite))
+
+
+def estatisticas_box(df, x, y):
+    """Quartis e limites de Tukey (1,5 × IQR) de `y` para cada valor de `x`."""
+    grupos = df.groupby(x, observed=True)[y]
+    stats = grupos.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ['q1', 'mediana', 'q3']
+    iqr = stats['q3'] - stats['q1']
+
+    # As cercas vão até o valor mais extremo que ainda está dentro do limite
+    limite_inf = df[x].map(stats['q1'] - 1.5 * iqr).astype(float)
+    limite_sup = df[x].map(stats['q3'] + 1.5 * iqr).astype(float)
+    dentro = df[y].between(limite_inf, limite_sup)
+    stats['cerca_inf'] = df.loc[dentro].groupby(x, observed=True)[y].min()
+    stats['cerca_sup'] = df.loc[dentro].groupby(x, observed=True)[y].max()
+    stats['media'] = grupos.mean()
+    stats['total'] = grupos.size()
+
+    outliers = df.loc[~dentro, [x, y]]
+    return stats, outliers
+
+
+def _outliers_limitados(outliers, x, y, stats, limite):
+    # Mantém os `limite` pontos mais distantes da mediana em cada grupo
+    distancia = (outliers[y] - outliers[x].map(stats['mediana']).astype(float)).abs()
+    ordem = distancia.sort_values(ascending=False).index
+    return outliers.loc[ordem].groupby(x, observed=True).head(limite)
+
+
+def _cores(grupos, cores):
+    cores = cores or px.colors.qualitative.Plotly
+    return {grupo: cores[i % len(cores)] for i, grupo in enumerate(grupos)}
+
+
+def _box_pre_agrupado(df, x, y, nivel, cores):
+    stats, outliers = estatisticas_box(df, x, y)
+    cor = _cores(stats.index, cores)
+
+    fig = go.Figure()
+    for grupo, linha in stats.iterrows():
+        fig.add_trace(go.Box(
+            x=[grupo], q1=[linha['q1']], median=[linha['mediana']], q3=[linha['q3']],
+            lowerfence=[linha['cerca_inf']], upperfence=[linha['cerca_sup']],
+            mean=[linha['media']], name=str(grupo), marker_color=cor[grupo]
+        ))
+
+    if nivel == 'outliers_limitados' and not outliers.empty:
+        outliers = _outliers_limitados(outliers, x, y, stats, PONTOS_POR_GRUPO)
+        for grupo, pontos in outliers.groupby(x, observed=True):
+            fig.add_trace(go.Scatter(
+                x=pontos[x], y=pontos[y], mode='markers', name=str(grupo),
+                marker=dict(color=cor[grupo], size=4), showlegend=False
+            ))
+    return fig
+
+
+def _barras_agregadas(df, x, y, cores):
+    # Só as médias dos grupos com mais faixas
+    stats = (df.groupby(x, observed=True)[y].agg(['mean', 'std', 'size'])
+               .nlargest(LIMITE_GRUPOS, 'size').reset_index())
+    return px.bar(stats, x=x, y='mean', error_y='std', color=x,
+                  color_discrete_sequence=cores)
+
+
+def figura_box(df, x, y, nivel, title=None, labels=None, color_discrete_sequence=None):
+    """Box plot de `y` por `x` (uma cor por grupo) no nível de detalhe pedido."""
+    if nivel == 'completo':
+        return px.box(df, x=x, y=y, points='outliers', color=x, title=title,
+                      labels=labels, color_discrete_sequence=color_discrete_sequence)
+    if nivel == 'agregado':
+        fig = _barras_agregadas(df, x, y, color_discrete_sequence)
+    else:
+        fig = _box_pre_agrupado(df, x, y, nivel, color_discrete_sequence)
+
+    labels = labels or {}
+    fig.update_layout(title=title, xaxis_title=labels.get(x, x), yaxis_title=labels.get(y, y))
+    return fig
+
+
+def figura_violin(df, x, y, nivel, title=None, labels=None):
+    """Violin de `y` por `x`; sem os dados completos vira amostra ou box pré-calculado."""
+    if nivel in ('pre_agrupado', 'agregado'):
+        # O plotly não aceita densidade pré-calculada; o box mantém os quartis
+        return figura_box(df, x, y, nivel, title=title, labels=labels)
+    if nivel == 'outliers_limitados':
+        df = amostra_por_grupo(df, x)
+    return px.violin(df, x=x, y=y, color=x, box=True, points='outliers',
+                     title=title, labels=labels)
+
+
+def figura_histograma(df, x, nivel, nbins=30, title=None, labels=None, color_discrete_sequence=None):
+    """Histograma de `x`; fora do nível completo as barras são calculadas no servidor."""
+    if nivel == 'completo':
+        return px.histogram(df, x=x, nbins=nbins, title=title, labels=labels,
+                            color_discrete_sequence=color_discrete_sequence)
+
+    contagens, bordas = np.histogram(df[x], bins=nbins)
+    centros = (bordas[:-1] + bordas[1:]) / 2
+    fig = px.bar(
+        pd.DataFrame({x: centros, 'count': contagens}), x=x, y='count',
+        title=title, labels=labels, color_discrete_sequence=color_discrete_sequence
+    )
+    fig.update_traces(width=bordas[1] - bordas[0])
+    fig.update_layout(bargap=0)
+    return fig
+
@@ -0,0 +1,186 @@
+"""Geração em lote dos relatórios de "Análise Detalhada" para todos os gêneros.
+
+Reaproveita os mesmos cálculos da página 04 (utils/analise_genero.py), sem
+precisar do Streamlit rodando. Cada gênero gera um arquivo HTML (gráficos)
+e um JSON (KPIs, top 10 e perfil médio).
+
+Uso:
+    python -m utils.relatorios --saida relatorios --processos 4
+"""
+import argparse
+import hashlib
+import html
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from utils.analise_genero import kpis_genero, figura_histograma, figura_3d, top_faixas, perfil_medio
+from utils.carrega_dados import CAMINHO_ARQUIVO, preparar_dados
+
+# Aumentar quando o conteúdo dos relatórios mudar, para forçar a regeração
+VERSAO_RELATORIO = 2
+
+NOME_MANIFESTO = 'manifesto.json'
+
+log = logging.getLogger('relatorios')
+
+
+def nome_arquivo(genero):
+    # Gêneros como "r-n-b" ou "singer-songwriter" viram nomes de arquivo
+    # seguros; o hash do nome evita que dois gêneros diferentes (ex.: "k pop"
+    # e "k_pop") caiam no mesmo arquivo
+    legivel = re.sub(r'[^a-z0-9_-]+', '_', genero.lower())
+    resumo = hashlib.sha1(genero.encode('utf-8')).hexdigest()[:8]
+    return f'{legivel}_{resumo}'
+
+
+def _numero(valor):
+    # Contagens continuam inteiras no JSON (1007, não 1007.0)
+    if isinstance(valor, (int, np.integer)):
+        return int(valor)
+    return float(valor)
+
+
+def impressao_digital(df_genero):
+    """Hash do conteúdo do gênero, usado para pular gêneros sem mudanças."""
+    hash_linhas = pd.util.hash_pandas_object(df_genero, index=False).values
+    resumo = hashlib.sha1(hash_linhas.tobytes())
+    resumo.update(str(VERSAO_RELATORIO).encode('utf-8'))
+    return resumo.hexdigest()
+
+
+def gerar_relatorio(genero, df_genero, pasta_saida):
+    """Gera o HTML e o JSON de um gênero e devolve o tempo gasto (segundos)."""
+    inicio = time.perf_counter()
+    base = os.path.join(pasta_saida, nome_arquivo(genero))
+
+    kpis = kpis_genero(df_genero)
+    dados = {
+        'genero': genero,
+        'kpis': {chave: _numero(valor) for chave, valor in kpis.items()},
+        'top_faixas': top_faixas(df_genero).to_dict(orient='records'),
+        'perfil_medio': {nome: _numero(valor) for nome, valor in perfil_medio(df_genero).items()},
+    }
+    with open(base + '.json', 'w', encoding='utf-8') as arquivo:
+        json.dump(dados, arquivo, ensure_ascii=False, indent=2)
+
+    # Semente fixa para a amostra do 3D não mudar entre execuções
+    figuras = [figura_histograma(df_genero, genero), figura_3d(df_genero, genero, semente=0)]
+    titulo = html.escape(genero)
+    with open(base + '.html', 'w', encoding='utf-8') as arquivo:
+        arquivo.write(f'<html><head><meta charset="utf-8"><title>{titulo}</title></head><body>\n')
+        arquivo.write(f'<h1>Análise Detalhada - {titulo}</h1>\n')
+        for i, fig in enumerate(figuras):
+            # O plotly.js é carregado uma única vez, pela CDN
+            arquivo.write(fig.to_html(full_html=False, include_plotlyjs='cdn' if i == 0 else False))
+        arquivo.write(top_faixas(df_genero).to_html())
+        arquivo.write('\n</body></html>\n')
+
+    return time.perf_counter() - inicio
+
+
+def _ler_manifesto(pasta_saida):
+    caminho = os.path.join(pasta_saida, NOME_MANIFESTO)
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def _salvar_manifesto(pasta_saida, manifesto):
+    caminho = os.path.join(pasta_saida, NOME_MANIFESTO)
+    with open(caminho + '.parcial', 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(caminho + '.parcial', caminho)
+
+
+def _remover_generos_ausentes(pasta_saida, manifesto, generos):
+    # Gêneros que saíram do dataset: apaga os arquivos e a entrada do manifesto
+    for genero in [g for g in manifesto if g not in generos]:
+        base = os.path.join(pasta_saida, nome_arquivo(genero))
+        for extensao in ('.html', '.json'):
+            try:
+                os.remove(base + extensao)
+            except OSError:
+                pass
+        del manifesto[genero]
+        log.info("%s: não está mais no dataset, relatório removido", genero)
+
+
+def gerar_todos(df, pasta_saida, processos=None, forcar=False):
+    """Gera os relatórios de todos os gêneros em paralelo.
+
+    Gêneros cujo conteúdo não mudou desde a última execução (mesma
+    impressão digital no manifesto e arquivos presentes) são pulados, e os
+    relatórios de gêneros que saíram do dataset são apagados.
+    Devolve a lista de gêneros gerados.
+    """
+    os.makedirs(pasta_saida, exist_ok=True)
+    manifesto = _ler_manifesto(pasta_saida)
+    _remover_generos_ausentes(pasta_saida, manifesto, set(df['track_genre'].unique()))
+
+    pendentes = {}
+    for genero, df_genero in df.groupby('track_genre'):
+        impressao = impressao_digital(df_genero)
+        base = os.path.join(pasta_saida, nome_arquivo(genero))
+        atualizado = (manifesto.get(genero) == impressao
+                      and os.path.exists(base + '.html')
+                      and os.path.exists(base + '.json'))
+        if atualizado and not forcar:
+            log.debug("%s: sem mudanças, pulando", genero)
+            continue
+        pendentes[genero] = (df_genero, impressao)
+
+    log.info("%d gêneros a gerar, %d sem mudanças",
+             len(pendentes), df['track_genre'].nunique() - len(pendentes))
+
+    inicio = time.perf_counter()
+    gerados = []
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = {
+            executor.submit(gerar_relatorio, genero, df_genero, pasta_saida): genero
+            for genero, (df_genero, _) in pendentes.items()
+        }
+        for futuro in as_completed(futuros):
+            genero = futuros[futuro]
+            try:
+                duracao = futuro.result()
+            except Exception:
+                log.exception("%s: falha ao gerar relatório", genero)
+                continue
+            log.info("%s: %d faixas em %.2fs", genero, len(pendentes[genero][0]), duracao)
+            manifesto[genero] = pendentes[genero][1]
+            gerados.append(genero)
+
+    _salvar_manifesto(pasta_saida, manifesto)
+    log.info("%d relatórios gerados em %.2fs", len(gerados), time.perf_counter() - inicio)
+    return gerados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera os relatórios por gênero em HTML/JSON.")
+    parser.add_argument('--dados', default=CAMINHO_ARQUIVO, help="Caminho do dataset.csv")
+    parser.add_argument('--saida', default='relatorios', help="Pasta onde os relatórios são gravados")
+    parser.add_argument('--processos', type=int, default=None,
+                        help="Número de processos em paralelo (padrão: número de CPUs)")
+    parser.add_argument('--forcar', action='store_true', help="Regera mesmo os gêneros sem mudanças")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Mostra também os gêneros pulados")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s %(levelname)s %(message)s'
+    )
+
+    df = preparar_dados(args.dados)
+    gerar_todos(df, args.saida, processos=args.processos, forcar=args.forcar)
+
+
+if __name__ == '__main__':
+    main()
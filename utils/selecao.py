@@ -0,0 +1,273 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Eixos do gráfico de dispersão usado para selecionar (brushing)
+EIXO_X = 'danceability'
+EIXO_Y = 'energy'
+
+# Número de células por eixo na grade pré-calculada (os eixos vão de 0 a 1)
+RESOLUCAO = 40
+
+# Atributos somados em cada célula (KPIs, radar, mapa de calor e insights)
+CARACTERISTICAS_CUBO = ['danceability', 'energy', 'valence', 'acousticness',
+                        'instrumentalness', 'speechiness', 'liveness', 'popularity']
+
+
+def _celula(valores):
+    return np.clip((np.asarray(valores, dtype=float) * RESOLUCAO).astype(int), 0, RESOLUCAO - 1)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def calcular_cubo(_df_filtrado, chave_filtros):
+    """Estatísticas da seleção filtrada por célula da grade (dançabilidade x energia).
+
+    Para cada gênero e célula guarda a contagem e a soma dos atributos; para
+    cada célula, a soma dos produtos cruzados (para a correlação). Também
+    guarda as linhas de cada célula, agrupadas, para refinar as bordas de
+    uma seleção sem varrer o DataFrame. A chave do cache é o estado dos
+    filtros; o resultado só é lido (nunca alterado), então fica em
+    `st.cache_resource` e não é copiado a cada rerun.
+    """
+    df = _df_filtrado
+    generos = sorted(df['track_genre'].unique())
+    codigo_genero = pd.Categorical(df['track_genre'], categories=generos).codes.astype(np.int64)
+    celula = _celula(df[EIXO_X]) * RESOLUCAO + _celula(df[EIXO_Y])
+    valores = df[CARACTERISTICAS_CUBO].to_numpy(dtype=float)
+
+    n_celulas = RESOLUCAO * RESOLUCAO
+    chave = codigo_genero * n_celulas + celula
+    tamanho = len(generos) * n_celulas
+
+    contagem = np.bincount(chave, minlength=tamanho).reshape(len(generos), n_celulas)
+    somas = np.stack([
+        np.bincount(chave, weights=valores[:, f], minlength=tamanho)
+        for f in range(valores.shape[1])
+    ], axis=-1).reshape(len(generos), n_celulas, -1)
+
+    # Uma soma por par de atributos (a matriz é simétrica)
+    n_atributos = valores.shape[1]
+    produtos = np.zeros((n_celulas, n_atributos, n_atributos))
+    for a in range(n_atributos):
+        for b in range(a, n_atributos):
+            soma_par = np.bincount(celula, weights=valores[:, a] * valores[:, b], minlength=n_celulas)
+            produtos[:, a, b] = soma_par
+            produtos[:, b, a] = soma_par
+
+    # Linhas agrupadas por célula: as da célula c ficam em ordem[inicio[c]:inicio[c + 1]]
+    ordem = np.argsort(celula, kind='stable')
+    inicio = np.concatenate([[0], np.cumsum(np.bincount(celula, minlength=n_celulas))])
+
+    cubo = {
+        'generos': tuple(generos),
+        'contagem': contagem,
+        'somas': somas,
+        'produtos': produtos,
+        'ordem': ordem,
+        'inicio': inicio,
+        'codigo_genero': codigo_genero,
+        'valores': valores,
+    }
+    # O cubo é compartilhado entre as sessões (cache_resource): nenhum
+    # array pode ser alterado
+    for valor in cubo.values():
+        if isinstance(valor, np.ndarray):
+            valor.setflags(write=False)
+    return cubo
+
+
+def regioes_da_selecao(evento):
+    """Converte o evento de seleção do `st.plotly_chart` em regiões (box/lasso)."""
+    if not evento:
+        return []
+    selecao = evento.get('selection', {})
+    regioes = []
+    for caixa in selecao.get('box', []):
+        regioes.append({'tipo': 'box', 'x': sorted(caixa['x'][:2]), 'y': sorted(caixa['y'][:2])})
+    for laco in selecao.get('lasso', []):
+        regioes.append({'tipo': 'lasso', 'x': np.asarray(laco['x'], dtype=float),
+                        'y': np.asarray(laco['y'], dtype=float)})
+    return regioes
+
+
+def _dentro_poligono(x, y, px, py):
+    # Ray casting: conta quantas arestas cruzam a semirreta à direita de cada
+    # ponto. Uma aresta só cruza a semirreta dos pontos com altura entre as
+    # das suas pontas; com os pontos ordenados por y, essa faixa é contígua
+    ordem = np.argsort(y, kind='stable')
+    xs, ys = x[ordem], y[ordem]
+    dentro = np.zeros(len(x), dtype=bool)
+    for i in range(len(px)):
+        x1, y1, x2, y2 = px[i - 1], py[i - 1], px[i], py[i]
+        if y1 == y2:
+            continue
+        inicio, fim = np.searchsorted(ys, [min(y1, y2), max(y1, y2)])
+        if inicio == fim:
+            continue
+        x_corte = x1 + (ys[inicio:fim] - y1) * (x2 - x1) / (y2 - y1)
+        dentro[inicio:fim] ^= xs[inicio:fim] < x_corte
+
+    resultado = np.empty_like(dentro)
+    resultado[ordem] = dentro
+    return resultado
+
+
+def dentro_regioes(x, y, regioes):
+    """Máscara dos pontos (x, y) dentro de qualquer uma das regiões."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    mascara = np.zeros(len(x), dtype=bool)
+    for regiao in regioes:
+        if regiao['tipo'] == 'box':
+            (x0, x1), (y0, y1) = regiao['x'], regiao['y']
+            mascara |= (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+        else:
+            mascara |= _dentro_poligono(x, y, regiao['x'], regiao['y'])
+    return mascara
+
+
+def chave_regioes(regioes):
+    """Representação hashable das regiões, para compor chaves de cache."""
+    return tuple(
+        (regiao['tipo'], tuple(float(v) for v in regiao['x']), tuple(float(v) for v in regiao['y']))
+        for regiao in regioes
+    )
+
+
+def _arestas_cruzam_celulas(px, py, cx0, cy0, cx1, cy1):
+    """Para cada célula, se alguma aresta do polígono toca o seu retângulo.
+
+    Teste de eixos separadores entre segmento e retângulo: há interseção se
+    as caixas envolventes se sobrepõem e os 4 cantos não ficam todos do
+    mesmo lado da reta da aresta. Tocar só a borda da célula também conta.
+    """
+    # Arestas nas linhas, células nas colunas
+    x1, y1 = px[:, None], py[:, None]
+    x2, y2 = np.roll(px, -1)[:, None], np.roll(py, -1)[:, None]
+
+    caixas = ((np.maximum(x1, x2) >= cx0) & (np.minimum(x1, x2) <= cx1) &
+              (np.maximum(y1, y2) >= cy0) & (np.minimum(y1, y2) <= cy1))
+
+    lados = [(x2 - x1) * (cy - y1) - (y2 - y1) * (cx - x1)
+             for cx, cy in ((cx0, cy0), (cx0, cy1), (cx1, cy0), (cx1, cy1))]
+    separados = np.logical_and.reduce([l > 0 for l in lados]) | np.logical_and.reduce([l < 0 for l in lados])
+
+    return (caixas & ~separados).any(axis=0)
+
+
+def _classificar_celulas(regioes):
+    """Separa as células em inteiramente dentro e na borda da seleção."""
+    limites = np.arange(RESOLUCAO + 1) / RESOLUCAO
+    cx0, cy0 = np.meshgrid(limites[:-1], limites[:-1], indexing='ij')
+    cx1, cy1 = cx0 + 1 / RESOLUCAO, cy0 + 1 / RESOLUCAO
+    cx0, cy0, cx1, cy1 = (c.ravel() for c in (cx0, cy0, cx1, cy1))
+
+    inteiras = np.zeros(RESOLUCAO * RESOLUCAO, dtype=bool)
+    tocadas = np.zeros(RESOLUCAO * RESOLUCAO, dtype=bool)
+    for regiao in regioes:
+        rx0, rx1 = np.min(regiao['x']), np.max(regiao['x'])
+        ry0, ry1 = np.min(regiao['y']), np.max(regiao['y'])
+        tocadas |= (cx1 >= rx0) & (cx0 <= rx1) & (cy1 >= ry0) & (cy0 <= ry1)
+
+        if regiao['tipo'] == 'box':
+            inteiras |= (cx0 >= rx0) & (cx1 <= rx1) & (cy0 >= ry0) & (cy1 <= ry1)
+        else:
+            # Os 4 cantos dentro do laço não bastam num laço côncavo: uma
+            # aresta pode atravessar a célula com as duas pontas fora dela.
+            # A célula só é inteira se nenhuma aresta a tocar
+            gx, gy = np.meshgrid(limites, limites, indexing='ij')
+            grade = dentro_regioes(gx.ravel(), gy.ravel(), [regiao]).reshape(gx.shape)
+            cantos = (grade[:-1, :-1] & grade[:-1, 1:] & grade[1:, :-1] & grade[1:, 1:]).ravel()
+            candidatas = np.flatnonzero(cantos)
+            cruzadas = _arestas_cruzam_celulas(
+                regiao['x'], regiao['y'],
+                cx0[candidatas], cy0[candidatas], cx1[candidatas], cy1[candidatas]
+            )
+            inteiras[candidatas[~cruzadas]] = True
+
+    return inteiras, tocadas & ~inteiras
+
+
+def agregar(cubo, regioes):
+    """Soma as células da seleção e refina as bordas linha a linha.
+
+    Sem regiões, devolve o total da seleção filtrada, sem `posicoes` (None):
+    as linhas são a própria seleção filtrada. O custo depende do número de
+    células e das linhas nas células da borda, não do tamanho do DataFrame.
+    """
+    if not regioes:
+        return {
+            'generos': cubo['generos'],
+            'contagem': cubo['contagem'].sum(axis=1),
+            'somas': cubo['somas'].sum(axis=1),
+            'produtos': cubo['produtos'].sum(axis=0),
+            'posicoes': None,
+        }
+
+    inteiras, borda = _classificar_celulas(regioes)
+
+    contagem = cubo['contagem'][:, inteiras].sum(axis=1)
+    somas = cubo['somas'][:, inteiras].sum(axis=1)
+    produtos = cubo['produtos'][inteiras].sum(axis=0)
+
+    ordem, inicio = cubo['ordem'], cubo['inicio']
+    posicoes = [ordem[inicio[c]:inicio[c + 1]] for c in np.flatnonzero(inteiras)]
+
+    # Células da borda: confere cada linha contra a região
+    linhas_borda = [ordem[inicio[c]:inicio[c + 1]] for c in np.flatnonzero(borda)]
+    if linhas_borda:
+        linhas_borda = np.concatenate(linhas_borda)
+        valores = cubo['valores'][linhas_borda]
+        dentro = dentro_regioes(valores[:, CARACTERISTICAS_CUBO.index(EIXO_X)],
+                                valores[:, CARACTERISTICAS_CUBO.index(EIXO_Y)], regioes)
+        linhas_borda, valores = linhas_borda[dentro], valores[dentro]
+
+        codigos = cubo['codigo_genero'][linhas_borda]
+        contagem = contagem + np.bincount(codigos, minlength=len(cubo['generos']))
+        np.add.at(somas, codigos, valores)
+        produtos = produtos + valores.T @ valores
+        posicoes.append(linhas_borda)
+
+    posicoes = np.sort(np.concatenate(posicoes)) if posicoes else np.empty(0, dtype=int)
+    return {
+        'generos': cubo['generos'],
+        'contagem': contagem,
+        'somas': somas,
+        'produtos': produtos,
+        'posicoes': posicoes,
+    }
+
+
+def total_faixas(agregado):
+    return int(agregado['contagem'].sum())
+
+
+def media_geral(agregado, coluna):
+    """Média de `coluna` em toda a seleção."""
+    indice = CARACTERISTICAS_CUBO.index(coluna)
+    return agregado['somas'][:, indice].sum() / total_faixas(agregado)
+
+
+def medias_por_genero(agregado, colunas=CARACTERISTICAS_CUBO):
+    """Médias dos atributos por gênero (só gêneros com faixas na seleção)."""
+    contagem = agregado['contagem']
+    presentes = contagem > 0
+    medias = agregado['somas'][presentes] / contagem[presentes, None]
+    df_medias = pd.DataFrame(
+        medias, columns=CARACTERISTICAS_CUBO,
+        index=pd.Index(np.asarray(agregado['generos'], dtype=object)[presentes], name='track_genre')
+    )
+    df_medias['total'] = contagem[presentes]
+    return df_medias[list(colunas) + ['total']]
+
+
+def correlacao(agregado, colunas=CARACTERISTICAS_CUBO):
+    """Correlação de Pearson entre os atributos, a partir das somas da seleção."""
+    n = total_faixas(agregado)
+    soma = agregado['somas'].sum(axis=0)
+    covariancia = (agregado['produtos'] - np.outer(soma, soma) / n) / (n - 1)
+    desvio = np.sqrt(np.diag(covariancia))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = covariancia / np.outer(desvio, desvio)
+    indices = [CARACTERISTICAS_CUBO.index(c) for c in colunas]
+    return pd.DataFrame(corr[np.ix_(indices, indices)], index=colunas, columns=colunas)
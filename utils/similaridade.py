@@ -0,0 +1,108 @@
+import numpy as np
+import streamlit as st
+
+from utils.armazenamento import persistente
+from utils.carrega_dados import carregar_dados
+
+# Atributos que formam o "perfil sonoro" de cada gênero
+CARACTERISTICAS_SIMILARIDADE = [
+    'danceability', 'energy', 'valence', 'acousticness', 'instrumentalness',
+    'speechiness', 'liveness', 'loudness', 'tempo',
+]
+
+# Pontos da função quantil usados para comparar distribuições
+N_QUANTIS = 50
+
+
+def _padronizar(valores, eixo=0):
+    # Coloca atributos em escalas diferentes (loudness em dB, tempo em BPM)
+    # na mesma escala, para nenhum dominar a distância
+    desvio = valores.std(axis=eixo, keepdims=True)
+    desvio[desvio == 0] = 1
+    return (valores - valores.mean(axis=eixo, keepdims=True)) / desvio
+
+
+def distancias_medias(df, generos):
+    """Distância euclidiana entre os perfis médios (padronizados) dos gêneros."""
+    medias = (df.groupby('track_genre')[CARACTERISTICAS_SIMILARIDADE].mean()
+                .loc[generos].to_numpy())
+    perfis = _padronizar(medias)
+    diferencas = perfis[:, None, :] - perfis[None, :, :]
+    return np.sqrt((diferencas ** 2).sum(axis=-1))
+
+
+def distancias_distribuicao(df, generos):
+    """Distância de Wasserstein-1 média entre as distribuições dos atributos.
+
+    Para distribuições em uma dimensão, a Wasserstein-1 é a área entre as
+    funções quantil; aqui ela é aproximada em `N_QUANTIS` pontos, com os
+    atributos padronizados sobre o dataset inteiro.
+    """
+    padronizado = df[CARACTERISTICAS_SIMILARIDADE].to_numpy(dtype=float)
+    padronizado = _padronizar(padronizado)
+    probabilidades = (np.arange(N_QUANTIS) + 0.5) / N_QUANTIS
+
+    posicao = {genero: i for i, genero in enumerate(generos)}
+    codigos = df['track_genre'].map(posicao).to_numpy()
+    quantis = np.stack([
+        np.quantile(padronizado[codigos == i], probabilidades, axis=0).T
+        for i in range(len(generos))
+    ])  # gêneros x atributos x quantis
+
+    diferencas = np.abs(quantis[:, None] - quantis[None, :])
+    return diferencas.mean(axis=(2, 3))
+
+
+def ordem_hierarquica(distancias):
+    """Ordem das folhas de um agrupamento hierárquico (ligação média).
+
+    Junta, a cada passo, os dois grupos mais próximos; a ordem final coloca
+    lado a lado os gêneros que foram agrupados primeiro, deixando blocos
+    visíveis no mapa de calor.
+    """
+    distancias = distancias.astype(float).copy()
+    np.fill_diagonal(distancias, np.inf)
+    grupos = {i: [i] for i in range(len(distancias))}
+    tamanhos = np.ones(len(distancias))
+
+    while len(grupos) > 1:
+        i, j = np.unravel_index(np.argmin(distancias), distancias.shape)
+        i, j = min(i, j), max(i, j)
+
+        # Distância média do novo grupo (i + j) a todos os outros
+        novo = (distancias[i] * tamanhos[i] + distancias[j] * tamanhos[j]) / (tamanhos[i] + tamanhos[j])
+        distancias[i, :] = novo
+        distancias[:, i] = novo
+        distancias[i, i] = np.inf
+        distancias[j, :] = np.inf
+        distancias[:, j] = np.inf
+        tamanhos[i] += tamanhos[j]
+
+        grupos[i] = grupos[i] + grupos.pop(j)
+
+    return next(iter(grupos.values()))
+
+
+@st.cache_resource(show_spinner="Calculando similaridade entre gêneros...")
+@persistente
+def carregar_similaridade():
+    """Matrizes de distância e ordem hierárquica, recalculadas só quando o dataset muda."""
+    df = carregar_dados()
+    generos = sorted(df['track_genre'].unique())
+    medias = distancias_medias(df, generos)
+    distribuicao = distancias_distribuicao(df, generos)
+    return {
+        'generos': generos,
+        'medias': medias,
+        'distribuicao': distribuicao,
+        'ordem_medias': ordem_hierarquica(medias),
+        'ordem_distribuicao': ordem_hierarquica(distribuicao),
+    }
+
+
+def generos_proximos(similaridade, genero, metrica='medias', n=10):
+    """Os `n` gêneros mais parecidos com `genero`, com a distância de cada um."""
+    generos = similaridade['generos']
+    distancias = similaridade[metrica][generos.index(genero)]
+    ordem = [i for i in np.argsort(distancias) if generos[i] != genero][:n]
+    return [(generos[i], float(distancias[i])) for i in ordem]